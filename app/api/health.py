@@ -1,15 +1,22 @@
 """Health check и статус эндпоинты"""
 
 from fastapi import APIRouter, Depends, status
+from fastapi.responses import PlainTextResponse
 from loguru import logger
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
+from app.core.cache import StaleWhileRevalidate, question_cache, question_flight
 from app.core.config import settings
-from app.core.database import get_async_session
+from app.core.database import engine, get_async_session, get_read_session_maker
+from app.core.metrics import pool_status, registry
+from app.crud.stats import stats_crud
 
 router = APIRouter(tags=["health"])
 
+metrics_snapshot = StaleWhileRevalidate(settings.metrics_snapshot_ttl_seconds)
+
 
 @router.get(
     "/health",
@@ -82,58 +89,88 @@ async def liveness_check():
     return {"status": "alive"}
 
 
+async def _collect_metrics(session_maker: sessionmaker) -> dict:
+    """Собрать метрики из счетчиков, поддерживаемых триггерами.
+
+    Args:
+        session_maker: Фабрика сессий
+
+    Returns:
+        Метрики сервиса
+    """
+    async with session_maker() as db:
+        counters = await stats_crud.get_counters(db)
+        users_total = await stats_crud.estimate_unique_users(db)
+
+    questions_total = counters.get("questions", 0)
+    answers_total = counters.get("answers", 0)
+
+    logger.debug(
+        f"Metrics: questions={questions_total}, "
+        f"answers={answers_total}, users={users_total}"
+    )
+
+    return {
+        "questions_total": questions_total,
+        "answers_total": answers_total,
+        "unique_users": users_total,
+        "avg_answers_per_question": (
+            round(answers_total / questions_total, 2)
+            if questions_total > 0 else 0
+        )
+    }
+
+
 @router.get(
     "/metrics",
     status_code=status.HTTP_200_OK,
     summary="Метрики сервиса"
 )
 async def metrics(
-    db: AsyncSession = Depends(get_async_session)
+    session_maker: sessionmaker = Depends(get_read_session_maker)
 ):
     """Получить метрики сервиса.
 
+    Счетчики читаются из таблицы stats_counters, количество уникальных
+    пользователей - приближенная оценка HyperLogLog. При включенном
+    снимке метрики обновляются в фоне не чаще раза в
+    metrics_snapshot_ttl_seconds.
+
     Args:
-        db: Сессия базы данных
+        session_maker: Фабрика сессий
 
     Returns:
         Метрики сервиса
     """
     try:
-        # Подсчет вопросов
-        questions_count = await db.execute(
-            text("SELECT COUNT(*) FROM questions")
-        )
-        questions_total = questions_count.scalar()
-
-        # Подсчет ответов
-        answers_count = await db.execute(
-            text("SELECT COUNT(*) FROM answers")
-        )
-        answers_total = answers_count.scalar()
-
-        # Подсчет уникальных пользователей
-        users_count = await db.execute(
-            text("SELECT COUNT(DISTINCT user_id) FROM answers")
-        )
-        users_total = users_count.scalar()
-
-        logger.debug(
-            f"Metrics: questions={questions_total}, "
-            f"answers={answers_total}, users={users_total}"
-        )
-
+        data = await metrics_snapshot.get(lambda: _collect_metrics(session_maker))
         return {
-            "questions_total": questions_total,
-            "answers_total": answers_total,
-            "unique_users": users_total,
-            "avg_answers_per_question": (
-                round(answers_total / questions_total, 2)
-                if questions_total > 0 else 0
-            )
+            **data,
+            "question_cache": question_cache.stats(),
+            "question_singleflight": question_flight.stats(),
+            "db_pool": pool_status(engine)
         }
     except Exception as e:
         logger.error(f"Error getting metrics: {e}")
         return {
             "error": "Unable to fetch metrics",
             "details": str(e)
-        }
\ No newline at end of file
+        }
+
+
+@router.get(
+    "/metrics/prometheus",
+    status_code=status.HTTP_200_OK,
+    summary="Метрики запросов в формате Prometheus",
+    response_class=PlainTextResponse
+)
+async def prometheus_metrics():
+    """Получить метрики HTTP запросов в текстовом формате Prometheus.
+
+    Returns:
+        Экспозиция метрик
+    """
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
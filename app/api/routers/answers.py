@@ -3,17 +3,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_async_session
+from app.core.cache import question_cache, question_cache_keys
+from app.core.database import get_async_session, get_read_session, track_writes
 from app.crud.answers import answer_crud
 from app.schemas.schemas import AnswerResponse
 
-router = APIRouter(prefix="/answers", tags=["answers"])
+router = APIRouter(
+    prefix="/answers",
+    tags=["answers"],
+    dependencies=[Depends(track_writes)]
+)
 
 
 @router.get("/{answer_id}", response_model=AnswerResponse)
 async def get_answer(
     answer_id: int,
-    db: AsyncSession = Depends(get_async_session)
+    db: AsyncSession = Depends(get_read_session)
 ):
     """Получить конкретный ответ"""
     answer = await answer_crud.get_by_id(db, answer_id)
@@ -31,10 +36,10 @@ async def delete_answer(
     db: AsyncSession = Depends(get_async_session)
 ):
     """Удалить ответ"""
-    answer = await answer_crud.get_by_id(db, answer_id)
-    if not answer:
+    question_id = await answer_crud.delete(db, answer_id)
+    if question_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Ответ с ID {answer_id} не найден"
         )
-    await answer_crud.delete(db, answer)
\ No newline at end of file
+    await question_cache.invalidate(*question_cache_keys(question_id))
\ No newline at end of file
@@ -1,31 +1,158 @@
 """API эндпоинты для работы с вопросами"""
 
-from typing import List
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple, Type
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from pydantic import ValidationError as PydanticValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app.core.database import get_async_session
+from app.core.admission import answer_rate_limiter, retry_after_header
+from app.core.cache import (
+    question_cache,
+    question_cache_key,
+    question_cache_keys,
+    question_flight,
+)
+from app.core.config import settings
+from app.core.database import (
+    database_features,
+    get_async_session,
+    get_read_session,
+    get_read_session_maker,
+    get_session_maker,
+    track_writes,
+)
+from app.core.etag import etag_matches, make_etag
+from app.core.events import answer_events
+from app.core.exceptions import FeatureUnavailableError
+from app.core.metrics import admission_rejected_total
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.serialization import FastJSONResponse, dump_json
 from app.crud.answers import answer_crud
 from app.crud.questions import question_crud
 from app.schemas.schemas import (
+    AnswerBulkResponse,
     AnswerCreate,
+    AnswerPaginatedResponse,
     AnswerResponse,
+    BulkItemError,
+    HotQuestion,
+    PaginatedResponse,
+    PaginationParams,
+    QuestionBulkResponse,
     QuestionCreate,
     QuestionResponse,
     QuestionWithAnswers,
+    SearchResponse,
+    SimilarQuestion,
 )
 
-router = APIRouter(prefix="/questions", tags=["questions"])
+router = APIRouter(
+    prefix="/questions",
+    tags=["questions"],
+    dependencies=[Depends(track_writes)]
+)
 
+# Тело запроса массового создания: список сырых объектов, каждый из
+# которых валидируется отдельно, чтобы сообщать об ошибках поэлементно
+BulkItems = List[Any]
+bulk_body = Body(..., min_length=1, max_length=settings.bulk_max_items)
+
+
+def _question_etag(
+        question_id: int,
+        updated_at: datetime,
+        last_answer_at: Optional[datetime],
+        answer_count: int
+) -> str:
+    """ETag вопроса с ответами"""
+    return make_etag("question", question_id, updated_at, last_answer_at, answer_count)
 
-@router.get("/", response_model=List[QuestionResponse])
+
+def _validate_items(
+        items: BulkItems,
+        schema: Type[BaseModel]
+) -> Tuple[List[BaseModel], List[BulkItemError]]:
+    """Провалидировать элементы массового запроса по схеме.
+
+    Args:
+        items: Сырые элементы из тела запроса
+        schema: Схема создания одного элемента
+
+    Returns:
+        Валидные элементы и ошибки невалидных
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append(schema.model_validate(item))
+        except PydanticValidationError as e:
+            errors.append(BulkItemError(
+                index=index,
+                errors=[
+                    f"{'.'.join(str(loc) for loc in error['loc']) or 'item'}: {error['msg']}"
+                    for error in e.errors()
+                ]
+            ))
+    return valid, errors
+
+
+@router.get(
+    "/",
+    response_model=PaginatedResponse,
+    responses={304: {"description": "Страница не изменилась"}}
+)
 async def get_all_questions(
-        db: AsyncSession = Depends(get_async_session)
+        request: Request,
+        pagination: PaginationParams = Depends(),
+        db: AsyncSession = Depends(get_read_session)
 ):
-    """Получить список всех вопросов"""
-    questions = await question_crud.get_all(db)
-    return questions
+    """Получить страницу списка вопросов"""
+    after = decode_cursor(pagination.cursor)
+    # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница
+    questions = await question_crud.get_page(db, pagination.page_size + 1, after)
+
+    next_cursor = None
+    if len(questions) > pagination.page_size:
+        questions = questions[:pagination.page_size]
+        last = questions[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    total = await question_crud.count(db) if pagination.include_total else None
+
+    # Версия страницы определяется ее строками, поэтому при совпадении
+    # ETag ответ не сериализуется
+    etag = make_etag(
+        "questions",
+        pagination.page_size,
+        next_cursor,
+        total,
+        *((q.id, q.updated_at, q.answer_count) for q in questions)
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    page = PaginatedResponse(
+        items=questions,
+        next_cursor=next_cursor,
+        page_size=pagination.page_size,
+        total=total
+    )
+    return FastJSONResponse(page, headers={"ETag": etag})
 
 
 @router.post("/", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
@@ -33,24 +160,256 @@ async def create_question(
         question_data: QuestionCreate,
         db: AsyncSession = Depends(get_async_session)
 ):
-    """Создать новый вопрос"""
-    question = await question_crud.create(db, question_data)
+    """Создать новый вопрос.
+
+    Без расширения pg_trgm вопрос создается без проверки на дубликаты.
+    """
+    duplicate_threshold = settings.duplicate_reject_threshold
+    if duplicate_threshold is not None and not await database_features.has_pg_trgm(db):
+        duplicate_threshold = None
+    question = await question_crud.create(
+        db,
+        question_data,
+        duplicate_threshold=duplicate_threshold
+    )
     return question
 
 
-@router.get("/{question_id}", response_model=QuestionWithAnswers)
+@router.post("/bulk", response_model=QuestionBulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_questions_bulk(
+        items: BulkItems = bulk_body,
+        db: AsyncSession = Depends(get_async_session)
+):
+    """Создать несколько вопросов одним запросом"""
+    questions_data, errors = _validate_items(items, QuestionCreate)
+    created = await question_crud.create_many(db, questions_data) if questions_data else []
+    return QuestionBulkResponse(created=created, errors=errors)
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search_questions(
+        q: str = Query(..., min_length=1, max_length=500, description="Поисковый запрос"),
+        page: int = Query(1, ge=1, le=100, description="Номер страницы"),
+        page_size: int = Query(10, ge=1, le=100, description="Размер страницы"),
+        db: AsyncSession = Depends(get_read_session)
+):
+    """Найти вопросы по тексту вопросов и ответов"""
+    # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница
+    hits = await question_crud.search(db, q, page_size + 1, (page - 1) * page_size)
+    return FastJSONResponse(SearchResponse(
+        items=hits[:page_size],
+        page=page,
+        page_size=page_size,
+        has_more=len(hits) > page_size
+    ))
+
+
+@router.get("/hot", response_model=List[HotQuestion])
+async def get_hot_questions(
+        limit: int = Query(10, ge=1, le=100, description="Количество вопросов"),
+        db: AsyncSession = Depends(get_read_session)
+):
+    """Получить вопросы с наибольшей недавней активностью ответов"""
+    return await question_crud.get_hot(db, limit)
+
+
+@router.get("/similar", response_model=List[SimilarQuestion])
+async def get_similar_questions(
+        text: str = Query(..., min_length=3, max_length=1000, description="Текст вопроса"),
+        threshold: float = Query(
+            settings.similar_questions_threshold,
+            gt=0,
+            le=1,
+            description="Минимальное сходство"
+        ),
+        limit: int = Query(settings.similar_questions_limit, ge=1, le=50),
+        db: AsyncSession = Depends(get_read_session)
+):
+    """Найти вопросы, похожие на текст"""
+    if not await database_features.has_pg_trgm(db):
+        raise FeatureUnavailableError(
+            "Поиск похожих вопросов недоступен: не установлено расширение pg_trgm"
+        )
+    return await question_crud.find_similar(db, text, threshold, limit)
+
+
+async def _export_lines(
+        session_maker: sessionmaker,
+        include_answers: bool,
+        created_from: Optional[datetime],
+        created_to: Optional[datetime]
+) -> AsyncIterator[str]:
+    """Сформировать выгрузку вопросов в формате NDJSON.
+
+    Вопросы читаются из серверного курсора пачками, ответы для каждой
+    пачки подгружаются одним запросом. Каждая пачка отдается клиенту
+    сразу, поэтому расход памяти не зависит от размера таблицы.
+    """
+    async with session_maker() as db:
+        async for batch in question_crud.stream_all(db, created_from, created_to):
+            answers = defaultdict(list)
+            if include_answers:
+                rows = await answer_crud.get_for_questions(db, [q.id for q in batch])
+                for answer in rows:
+                    answers[answer.question_id].append(answer)
+
+            lines = []
+            for question in batch:
+                if include_answers:
+                    item = QuestionWithAnswers.model_validate(
+                        {**question._mapping, "answers": answers[question.id]}
+                    )
+                else:
+                    item = QuestionResponse.model_validate(question)
+                lines.append(item.model_dump_json())
+            yield "\n".join(lines) + "\n"
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_questions(
+        include_answers: bool = Query(False, description="Включить ответы в выгрузку"),
+        created_from: Optional[datetime] = Query(None, description="Создан не раньше"),
+        created_to: Optional[datetime] = Query(None, description="Создан раньше"),
+        session_maker: sessionmaker = Depends(get_read_session_maker)
+):
+    """Выгрузить вопросы потоком в формате NDJSON"""
+    return StreamingResponse(
+        _export_lines(session_maker, include_answers, created_from, created_to),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get(
+    "/{question_id}",
+    response_model=QuestionWithAnswers,
+    responses={304: {"description": "Вопрос не изменился"}}
+)
 async def get_question_with_answers(
         question_id: int,
-        db: AsyncSession = Depends(get_async_session)
+        request: Request,
+        max_answers: Optional[int] = Query(
+            settings.question_default_max_answers,
+            ge=1,
+            le=settings.question_preview_max_answers,
+            description=(
+                "Встроить только первые N ответов; остальные доступны "
+                "через GET /questions/{id}/answers по answers_next_cursor"
+            )
+        ),
+        read_session_maker: sessionmaker = Depends(get_read_session_maker),
+        session_maker: sessionmaker = Depends(get_session_maker)
 ):
-    """Получить вопрос и все ответы на него"""
-    question = await question_crud.get_with_answers(db, question_id)
-    if not question:
+    """Получить вопрос и все ответы на него или их превью.
+
+    Кэш и single-flight общие для всех клиентов, поэтому промахи
+    загружаются с primary: значение, прочитанное с отстающей реплики
+    сразу после инвалидации, отдавалось бы из кэша и клиенту, только
+    что записавшему ответ. Реплика используется для проверки версии.
+    """
+    if max_answers is not None:
+        return await _get_question_preview(question_id, max_answers, request, session_maker)
+
+    if request.headers.get("if-none-match"):
+        # Версию проверяем по строке вопроса, не загружая ответы
+        async with read_session_maker() as db:
+            version = await question_crud.get_version(db, question_id)
+        if version is not None:
+            etag = _question_etag(question_id, *version)
+            if etag_matches(request, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": etag}
+                )
+
+    key = question_cache_key(question_id)
+
+    async def load():
+        async with session_maker() as db:
+            question = await question_crud.get_with_answers(db, question_id)
+            return QuestionWithAnswers.model_validate(question) if question else None
+
+    async def render():
+        question = await question_cache.get_or_load(key, load)
+        if not question:
+            return None
+        etag = _question_etag(
+            question_id,
+            question.updated_at,
+            max((a.created_at for a in question.answers), default=None),
+            question.answer_count
+        )
+        return etag, dump_json(question)
+
+    # Одновременные запросы одного вопроса разделяют загрузку и
+    # сериализацию; соединение из пула берется только при промахе кэша
+    rendered = await question_flight.do(key, render)
+    if rendered is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Вопрос с ID {question_id} не найден"
         )
-    return question
+
+    etag, body = rendered
+    return FastJSONResponse(body, headers={"ETag": etag})
+
+
+def _trim_answers(question: QuestionWithAnswers, max_answers: int) -> QuestionWithAnswers:
+    """Оставить в превью первые max_answers ответов"""
+    if len(question.answers) <= max_answers:
+        return question
+    last = question.answers[max_answers - 1]
+    return question.model_copy(update={
+        "answers": question.answers[:max_answers],
+        "answers_next_cursor": encode_cursor(last.created_at, last.id)
+    })
+
+
+async def _get_question_preview(
+        question_id: int,
+        max_answers: int,
+        request: Request,
+        session_maker: sessionmaker
+) -> Response:
+    """Вопрос с первыми max_answers ответами.
+
+    Кэш хранит одно превью на вопрос с question_preview_max_answers
+    ответами, меньшие превью получаются его обрезкой. Стоимость
+    загрузки - два запроса по индексам, независимо от числа ответов.
+    Как и полный вопрос, превью загружается с primary.
+    """
+    key = question_cache_key(question_id, preview=True)
+    limit = settings.question_preview_max_answers
+
+    async def load():
+        async with session_maker() as db:
+            question = await question_crud.get_summary(db, question_id)
+            if question is None:
+                return None
+            answers = await answer_crud.get_page(db, question_id, limit + 1)
+        preview = QuestionWithAnswers.model_validate({**question._mapping, "answers": answers})
+        return _trim_answers(preview, limit)
+
+    question = await question_flight.do(key, lambda: question_cache.get_or_load(key, load))
+    if question is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Вопрос с ID {question_id} не найден"
+        )
+
+    question = _trim_answers(question, max_answers)
+    # Превью не содержит всех ответов, поэтому версия строится по его
+    # содержимому, а не по get_version
+    etag = make_etag(
+        "question-preview",
+        question_id,
+        question.updated_at,
+        question.answer_count,
+        question.answers_next_cursor,
+        *((a.id, a.updated_at) for a in question.answers)
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return FastJSONResponse(question, headers={"ETag": etag})
 
 
 @router.delete("/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -59,13 +418,61 @@ async def delete_question(
         db: AsyncSession = Depends(get_async_session)
 ):
     """Удалить вопрос вместе со всеми ответами"""
-    question = await question_crud.get_by_id(db, question_id)
-    if not question:
+    if not await question_crud.delete(db, question_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Вопрос с ID {question_id} не найден"
         )
-    await question_crud.delete(db, question)
+    await question_cache.invalidate(*question_cache_keys(question_id))
+
+
+@router.get(
+    "/{question_id}/answers",
+    response_model=AnswerPaginatedResponse,
+    responses={304: {"description": "Страница не изменилась"}}
+)
+async def get_question_answers(
+        question_id: int,
+        request: Request,
+        pagination: PaginationParams = Depends(),
+        db: AsyncSession = Depends(get_read_session)
+):
+    """Получить страницу ответов на вопрос в порядке создания"""
+    after = decode_cursor(pagination.cursor)
+    answers = await answer_crud.get_page(db, question_id, pagination.page_size + 1, after)
+    # Пустая страница - либо конец ответов, либо вопроса нет
+    if not answers and not await question_crud.exists(db, question_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Вопрос с ID {question_id} не найден"
+        )
+
+    next_cursor = None
+    if len(answers) > pagination.page_size:
+        answers = answers[:pagination.page_size]
+        last = answers[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    total = await answer_crud.count(db, question_id) if pagination.include_total else None
+
+    etag = make_etag(
+        "answers",
+        question_id,
+        pagination.page_size,
+        next_cursor,
+        total,
+        *((a.id, a.updated_at) for a in answers)
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    page = AnswerPaginatedResponse(
+        items=answers,
+        next_cursor=next_cursor,
+        page_size=pagination.page_size,
+        total=total
+    )
+    return FastJSONResponse(page, headers={"ETag": etag})
 
 
 @router.post("/{question_id}/answers/", response_model=AnswerResponse, status_code=status.HTTP_201_CREATED)
@@ -75,13 +482,92 @@ async def create_answer(
         db: AsyncSession = Depends(get_async_session)
 ):
     """Добавить ответ к вопросу"""
-    # Проверяем существование вопроса
-    question = await question_crud.get_by_id(db, question_id)
-    if not question:
+    retry_after = answer_rate_limiter.acquire(answer_data.user_id)
+    if retry_after is not None:
+        admission_rejected_total.inc("write", "rate_limited")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Слишком много ответов, повторите запрос позже",
+            headers=retry_after_header(retry_after)
+        )
+
+    answer = await answer_crud.create(db, answer_data, question_id)
+    if not answer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Вопрос с ID {question_id} не найден"
         )
+    await question_cache.invalidate(*question_cache_keys(question_id))
+    return answer
 
-    answer = await answer_crud.create(db, answer_data, question_id)
-    return answer
\ No newline at end of file
+
+@router.post(
+    "/{question_id}/answers/bulk",
+    response_model=AnswerBulkResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_answers_bulk(
+        question_id: int,
+        items: BulkItems = bulk_body,
+        db: AsyncSession = Depends(get_async_session)
+):
+    """Добавить несколько ответов к вопросу одним запросом"""
+    if not await question_crud.exists(db, question_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Вопрос с ID {question_id} не найден"
+        )
+
+    answers_data, errors = _validate_items(items, AnswerCreate)
+    created = (
+        await answer_crud.create_many(db, answers_data, question_id)
+        if answers_data else []
+    )
+    if created:
+        await question_cache.invalidate(*question_cache_keys(question_id))
+    return AnswerBulkResponse(created=created, errors=errors)
+
+
+@router.get(
+    "/{question_id}/answers/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}}
+)
+async def stream_answers(
+        question_id: int,
+        session_maker: sessionmaker = Depends(get_read_session_maker)
+):
+    """Поток новых и удаленных ответов на вопрос (Server-Sent Events).
+
+    События: answer_created (ответ целиком), answer_deleted и
+    question_deleted (id), evicted (клиент не успевал читать поток).
+    Ответы, созданные до подписки, нужно получить через GET вопроса.
+    """
+    subscription = await answer_events.subscribe(question_id)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Слишком много подписчиков, повторите запрос позже",
+            headers=retry_after_header(settings.admission_retry_after_seconds)
+        )
+
+    # Проверяем вопрос после подписки, чтобы не пропустить его удаление;
+    # соединение не удерживается на время потока. До передачи подписки
+    # потоку ее нужно снять при любой ошибке, иначе она останется в хабе
+    try:
+        async with session_maker() as db:
+            exists = await question_crud.exists(db, question_id)
+        if not exists:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Вопрос с ID {question_id} не найден"
+            )
+    except BaseException:
+        answer_events.unsubscribe(subscription)
+        raise
+
+    return StreamingResponse(
+        answer_events.stream(subscription, settings.answer_stream_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
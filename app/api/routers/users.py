@@ -0,0 +1,68 @@
+"""API эндпоинты для работы с пользователями"""
+
+from fastapi import APIRouter, Depends, Path, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_read_session, track_writes
+from app.core.etag import etag_matches, make_etag
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.serialization import FastJSONResponse
+from app.crud.answers import answer_crud
+from app.schemas.schemas import PaginationParams, UserAnswersResponse
+
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    dependencies=[Depends(track_writes)]
+)
+
+
+@router.get(
+    "/{user_id}/answers",
+    response_model=UserAnswersResponse,
+    responses={304: {"description": "Страница не изменилась"}}
+)
+async def get_user_answers(
+        request: Request,
+        user_id: str = Path(..., min_length=1, max_length=100),
+        pagination: PaginationParams = Depends(),
+        db: AsyncSession = Depends(get_read_session)
+):
+    """Получить страницу ответов пользователя, начиная с новых.
+
+    При include_total заполняются total и questions_answered.
+    """
+    after = decode_cursor(pagination.cursor)
+    answers = await answer_crud.get_user_page(db, user_id, pagination.page_size + 1, after)
+
+    next_cursor = None
+    if len(answers) > pagination.page_size:
+        answers = answers[:pagination.page_size]
+        last = answers[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    total = questions_answered = None
+    if pagination.include_total:
+        stats = await answer_crud.get_user_stats(db, user_id)
+        total, questions_answered = stats.total, stats.questions_answered
+
+    etag = make_etag(
+        "user-answers",
+        user_id,
+        pagination.page_size,
+        next_cursor,
+        total,
+        questions_answered,
+        *((a.id, a.updated_at) for a in answers)
+    )
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    page = UserAnswersResponse(
+        items=answers,
+        next_cursor=next_cursor,
+        page_size=pagination.page_size,
+        total=total,
+        questions_answered=questions_answered
+    )
+    return FastJSONResponse(page, headers={"ETag": etag})
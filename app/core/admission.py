@@ -0,0 +1,255 @@
+"""Контроль допуска запросов и ограничение частоты.
+
+Когда база данных замедляется, запросы не должны бесконечно копиться в
+ожидании соединений из пула. Каждый класс маршрутов (чтение и запись)
+имеет свой лимит одновременных запросов и ограниченную очередь; при
+переполнении очереди или слишком долгом ожидании запрос сразу получает
+503 с заголовком Retry-After.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import (
+    admission_in_flight,
+    admission_rejected_total,
+    admission_waiting,
+)
+
+# Методы, обрабатываемые лимитом чтения
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class Overloaded(Exception):
+    """Запрос не допущен к обработке"""
+
+    def __init__(self, reason: str):
+        """Инициализация исключения.
+
+        Args:
+            reason: Причина отказа (queue_full или queue_timeout)
+        """
+        self.reason = reason
+        super().__init__(reason)
+
+
+class AdmissionLimiter:
+    """Лимит одновременных запросов с ограниченной очередью ожидания"""
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        """Инициализация лимита.
+
+        Args:
+            name: Класс маршрутов для метрик
+            limit: Максимум одновременно обрабатываемых запросов
+            queue_size: Максимум запросов в очереди
+            queue_timeout: Максимальное время ожидания в очереди в секундах
+        """
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> None:
+        """Дождаться допуска к обработке.
+
+        Raises:
+            Overloaded: Если очередь заполнена или ожидание истекло
+        """
+        if self._semaphore.locked():
+            if self.waiting >= self.queue_size:
+                raise Overloaded("queue_full")
+            self.waiting += 1
+            admission_waiting.inc(self.name)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise Overloaded("queue_timeout")
+            finally:
+                self.waiting -= 1
+                admission_waiting.dec(self.name)
+        else:
+            await self._semaphore.acquire()
+        admission_in_flight.inc(self.name)
+
+    def release(self) -> None:
+        """Освободить место для следующего запроса"""
+        admission_in_flight.dec(self.name)
+        self._semaphore.release()
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware контроля допуска.
+
+    Запросы на чтение и запись ограничиваются отдельными лимитами,
+    чтобы всплеск записи не блокировал чтение и наоборот. Служебные
+    пути (health, metrics) и потоки событий не ограничиваются. Долгие
+    ответы (выгрузки) получают собственный лимит без очереди, чтобы не
+    занимать места обычных запросов на все время передачи.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            read_limit: int,
+            write_limit: int,
+            queue_size: int,
+            queue_timeout: float,
+            retry_after: int = 1,
+            exempt_paths: Iterable[str] = (),
+            exempt_suffixes: Iterable[str] = (),
+            path_limits: Mapping[str, int] = {}
+    ):
+        """Инициализация middleware.
+
+        Args:
+            app: ASGI приложение
+            read_limit: Лимит одновременных запросов на чтение
+            write_limit: Лимит одновременных запросов на запись
+            queue_size: Размер очереди каждого класса
+            queue_timeout: Максимальное время ожидания в очереди в секундах
+            retry_after: Значение заголовка Retry-After в секундах
+            exempt_paths: Пути, не подлежащие ограничению
+            exempt_suffixes: Окончания путей, не подлежащих ограничению
+                (долгие потоки, которые иначе навсегда займут место)
+            path_limits: Собственные лимиты путей; сверх лимита запрос
+                сразу получает 503, не ожидая в очереди
+        """
+        self.app = app
+        self.retry_after = retry_after
+        self.exempt_paths = frozenset(exempt_paths)
+        self.exempt_suffixes = tuple(exempt_suffixes)
+        self.limiters: Dict[str, AdmissionLimiter] = {
+            "read": AdmissionLimiter("read", read_limit, queue_size, queue_timeout),
+            "write": AdmissionLimiter("write", write_limit, queue_size, queue_timeout),
+        }
+        self.path_limiters: Dict[str, AdmissionLimiter] = {
+            path: AdmissionLimiter(path, limit, 0, 0)
+            for path, limit in path_limits.items()
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработать запрос"""
+        if (
+                scope["type"] != "http"
+                or scope["path"] in self.exempt_paths
+                or scope["path"].endswith(self.exempt_suffixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        route_class = scope["path"]
+        limiter = self.path_limiters.get(route_class)
+        if limiter is None:
+            route_class = "read" if scope["method"] in READ_METHODS else "write"
+            limiter = self.limiters[route_class]
+        try:
+            await limiter.acquire()
+        except Overloaded as e:
+            admission_rejected_total.inc(route_class, e.reason)
+            await self._reject(scope, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, scope: Scope, send: Send) -> None:
+        """Отправить ответ 503 в формате ошибок приложения"""
+        body = json.dumps({
+            "detail": "Сервис перегружен, повторите запрос позже",
+            "status_code": 503,
+            "path": scope["path"]
+        }, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"retry-after", str(self.retry_after).encode("ascii")),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class TokenBucketLimiter:
+    """Ограничение частоты по ключу алгоритмом token bucket.
+
+    Корзины хранятся в LRU: при превышении max_keys вытесняются давно
+    не использовавшиеся ключи, поэтому память ограничена.
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            burst: int,
+            max_keys: int = 100_000,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        """Инициализация лимита.
+
+        Args:
+            rate: Пополнение токенов в секунду
+            burst: Емкость корзины
+            max_keys: Максимум хранимых корзин
+            clock: Источник монотонного времени
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, key: str) -> Optional[float]:
+        """Взять токен из корзины ключа.
+
+        Args:
+            key: Ключ ограничения (например user_id)
+
+        Returns:
+            None, если запрос разрешен, иначе время до появления
+            токена в секундах
+        """
+        now = self.clock()
+        tokens, updated_at = self._buckets.pop(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate)
+
+        if tokens >= 1:
+            self._store(key, tokens - 1, now)
+            return None
+        self._store(key, tokens, now)
+        return (1 - tokens) / self.rate
+
+    def _store(self, key: str, tokens: float, now: float) -> None:
+        """Сохранить состояние корзины"""
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def clear(self) -> None:
+        """Сбросить все корзины"""
+        self._buckets.clear()
+
+
+def retry_after_header(seconds: float) -> Dict[str, str]:
+    """Заголовок Retry-After с округлением вверх до целых секунд"""
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+# Лимит ответов одного пользователя для POST /questions/{id}/answers/
+answer_rate_limiter = TokenBucketLimiter(
+    settings.answer_rate_per_second,
+    settings.answer_rate_burst,
+    settings.answer_rate_max_users
+)
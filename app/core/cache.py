@@ -0,0 +1,458 @@
+"""Кэширование ответов API"""
+
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from loguru import logger
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.schemas.schemas import QuestionWithAnswers
+
+
+class CacheBackend(ABC):
+    """Интерфейс общего (межпроцессного) уровня кэша"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Получить значение по ключу"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Сохранить значение на ttl секунд"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Удалить значение"""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Удалить все значения"""
+
+
+class MemoryBackend(CacheBackend):
+    """Общий уровень кэша в памяти процесса.
+
+    Заменяет внешнее хранилище при локальной разработке и в тестах.
+    """
+
+    def __init__(self):
+        """Инициализация хранилища"""
+        self._data: Dict[str, Tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Получить значение по ключу"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Сохранить значение на ttl секунд"""
+        self._data[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, key: str) -> None:
+        """Удалить значение"""
+        self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        """Удалить все значения"""
+        self._data.clear()
+
+
+class FileBackend(CacheBackend):
+    """Общий уровень кэша в файлах.
+
+    Позволяет разделять кэш между воркерами одной машины. Файловые
+    операции выполняются в пуле потоков, чтобы не блокировать event loop.
+    """
+
+    def __init__(self, directory: str):
+        """Инициализация хранилища.
+
+        Args:
+            directory: Каталог для файлов кэша
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        """Путь к файлу значения"""
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        """Прочитать значение из файла"""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires_at, value = f.read().split(b"\n", 1)
+        except (FileNotFoundError, ValueError):
+            return None
+        if float(expires_at) < time.time():
+            self._remove(key)
+            return None
+        return value
+
+    def _write(self, key: str, value: bytes, ttl: float) -> None:
+        """Атомарно записать значение в файл"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(f"{time.time() + ttl}\n".encode("ascii") + value)
+        os.replace(tmp_path, path)
+
+    def _remove(self, key: str) -> None:
+        """Удалить файл значения"""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _clear(self) -> None:
+        """Удалить все файлы кэша"""
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Получить значение по ключу"""
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Сохранить значение на ttl секунд"""
+        await asyncio.to_thread(self._write, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        """Удалить значение"""
+        await asyncio.to_thread(self._remove, key)
+
+    async def clear(self) -> None:
+        """Удалить все значения"""
+        await asyncio.to_thread(self._clear)
+
+
+class LRUCache:
+    """Локальный LRU-кэш с ограничением времени жизни записей"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        """Инициализация кэша.
+
+        Args:
+            max_entries: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Количество записей"""
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Получить значение и отметить его как недавно использованное"""
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Сохранить значение, вытеснив самые старые записи при переполнении"""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Удалить значение"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Удалить все значения"""
+        self._data.clear()
+
+
+class ResponseCache:
+    """Двухуровневый read-through кэш для Pydantic-схем ответов.
+
+    Первый уровень - LRU в памяти процесса, хранит готовые объекты схем.
+    Второй, необязательный, - общий бэкенд, хранит JSON.
+
+    С общим бэкендом у каждого ключа есть версия, которую инвалидация
+    заменяет в общем бэкенде. Записи обоих уровней помнят версию, при
+    которой были загружены, и при несовпадении считаются промахом,
+    поэтому инвалидация в одном процессе действует и на локальные
+    уровни остальных. Загрузка, во время которой ключ инвалидировался,
+    не сохраняется; инвалидация других ключей на нее не влияет.
+    """
+
+    def __init__(
+            self,
+            schema: Type[BaseModel],
+            local: LRUCache,
+            shared: Optional[CacheBackend] = None,
+            shared_ttl: float = 60.0,
+            enabled: bool = True,
+            flight: Optional[SingleFlight] = None
+    ):
+        """Инициализация кэша.
+
+        Args:
+            schema: Схема кэшируемых значений
+            local: Локальный уровень
+            shared: Общий уровень
+            shared_ttl: Время жизни записей общего уровня в секундах
+            enabled: Включен ли кэш
+            flight: Single-flight загрузок по тем же ключам; при
+                инвалидации новые запросы к нему не присоединяются
+        """
+        self.schema = schema
+        self.local = local
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        # Версия должна пережить любую запись с предыдущей версией:
+        # после ее истечения такие записи снова считались бы актуальными
+        self.version_ttl = 2 * max(shared_ttl, local.ttl)
+        self.enabled = enabled
+        self.flight = flight
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Идущие загрузки по ключам: флаг "ключ инвалидирован"
+        self._loading: Dict[str, List[List[bool]]] = {}
+
+    @staticmethod
+    def _version_key(key: str) -> str:
+        """Ключ версии в общем бэкенде"""
+        return f"{key}:version"
+
+    async def _version(self, key: str) -> bytes:
+        """Текущая версия ключа; без общего бэкенда версия не нужна"""
+        if self.shared is None:
+            return b""
+        version = await self._shared_call(self.shared.get(self._version_key(key)))
+        return version or b""
+
+    async def get_or_load(
+            self,
+            key: str,
+            loader: Callable[[], Awaitable[Optional[BaseModel]]]
+    ) -> Optional[BaseModel]:
+        """Получить значение из кэша или загрузить его.
+
+        Если во время загрузки ключ инвалидировался (в этом или другом
+        процессе), загруженное значение не сохраняется: оно могло быть
+        прочитано до изменения.
+
+        Args:
+            key: Ключ кэша
+            loader: Функция загрузки значения, None не кэшируется
+
+        Returns:
+            Значение или None
+        """
+        if not self.enabled:
+            return await loader()
+
+        version = await self._version(key)
+        entry = self.local.get(key)
+        if entry is not None:
+            entry_version, value = entry
+            if entry_version == version:
+                self.hits += 1
+                return value
+            self.local.delete(key)
+
+        if self.shared is not None:
+            raw = await self._shared_call(self.shared.get(key))
+            if raw is not None:
+                entry_version, _, payload = raw.partition(b"\n")
+                if entry_version == version:
+                    value = self.schema.model_validate_json(payload)
+                    self.local.set(key, (version, value))
+                    self.shared_hits += 1
+                    return value
+
+        self.misses += 1
+        invalidated = [False]
+        self._loading.setdefault(key, []).append(invalidated)
+        try:
+            value = await loader()
+        finally:
+            loads = self._loading[key]
+            loads.remove(invalidated)
+            if not loads:
+                del self._loading[key]
+
+        if value is None or invalidated[0] or await self._version(key) != version:
+            return value
+
+        self.local.set(key, (version, value))
+        if self.shared is not None:
+            await self._shared_call(self.shared.set(
+                key,
+                version + b"\n" + value.model_dump_json().encode("utf-8"),
+                self.shared_ttl
+            ))
+        return value
+
+    async def invalidate(self, *keys: str) -> None:
+        """Удалить значения из всех уровней кэша во всех процессах"""
+        self.invalidations += 1
+        for key in keys:
+            self.local.delete(key)
+            for invalidated in self._loading.get(key, ()):
+                invalidated[0] = True
+            if self.flight is not None:
+                self.flight.forget(key)
+        if self.shared is not None:
+            for key in keys:
+                await self._shared_call(self.shared.set(
+                    self._version_key(key),
+                    uuid.uuid4().hex.encode("ascii"),
+                    self.version_ttl
+                ))
+                await self._shared_call(self.shared.delete(key))
+
+    async def clear(self) -> None:
+        """Очистить все уровни кэша.
+
+        Локальные уровни других процессов не очищаются; используется в
+        тестах и при обслуживании.
+        """
+        self.invalidations += 1
+        self.local.clear()
+        for loads in self._loading.values():
+            for invalidated in loads:
+                invalidated[0] = True
+        if self.flight is not None:
+            self.flight.clear()
+        if self.shared is not None:
+            await self._shared_call(self.shared.clear())
+
+    async def _shared_call(self, operation: Awaitable[Any]) -> Any:
+        """Выполнить операцию общего уровня, не роняя запрос при его сбое"""
+        try:
+            return await operation
+        except Exception as e:
+            logger.warning(f"Shared cache backend error: {e}")
+            return None
+
+    def stats(self) -> Dict[str, int]:
+        """Получить счетчики кэша"""
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.local.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self.local)
+        }
+
+
+class StaleWhileRevalidate:
+    """Снимок значения с обновлением в фоне.
+
+    Пока снимок свежий, он отдается без загрузки. Устаревший снимок тоже
+    отдается сразу, а загрузка нового запускается одной фоновой задачей.
+    """
+
+    def __init__(self, ttl: float):
+        """Инициализация снимка.
+
+        Args:
+            ttl: Время, в течение которого снимок считается свежим;
+                0 отключает снимок
+        """
+        self.ttl = ttl
+        self._value: Optional[Any] = None
+        self._loaded_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def get(self, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Получить снимок, при необходимости запустив обновление"""
+        if self.ttl <= 0:
+            return await loader()
+
+        if self._value is None:
+            await self._revalidate(loader, raise_errors=True)
+        elif time.monotonic() - self._loaded_at > self.ttl:
+            if self._refresh is None or self._refresh.done():
+                self._refresh = asyncio.create_task(self._revalidate(loader))
+        return self._value
+
+    async def _revalidate(
+            self,
+            loader: Callable[[], Awaitable[Any]],
+            raise_errors: bool = False
+    ) -> None:
+        """Загрузить новое значение снимка"""
+        try:
+            self._value = await loader()
+            self._loaded_at = time.monotonic()
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.warning(f"Snapshot refresh failed: {e}")
+
+    def clear(self) -> None:
+        """Сбросить снимок"""
+        self._value = None
+        self._loaded_at = 0.0
+
+
+def create_shared_backend() -> Optional[CacheBackend]:
+    """Создать общий уровень кэша по настройкам"""
+    if settings.cache_shared_backend == "memory":
+        return MemoryBackend()
+    if settings.cache_shared_backend == "file":
+        return FileBackend(settings.cache_file_dir)
+    return None
+
+
+def question_cache_key(question_id: int, preview: bool = False) -> str:
+    """Ключ кэша вопроса со всеми ответами или с превью ответов"""
+    if preview:
+        return f"question:{question_id}:preview"
+    return f"question:{question_id}"
+
+
+def question_cache_keys(question_id: int) -> List[str]:
+    """Все ключи кэша вопроса: их нужно инвалидировать вместе"""
+    return [question_cache_key(question_id), question_cache_key(question_id, preview=True)]
+
+
+# Объединение одновременных запросов GET /questions/{question_id}
+question_flight = SingleFlight("question")
+
+# Кэш эндпоинта GET /questions/{question_id}
+question_cache = ResponseCache(
+    QuestionWithAnswers,
+    LRUCache(settings.cache_max_entries, settings.cache_ttl_seconds),
+    shared=create_shared_backend(),
+    shared_ttl=settings.cache_shared_ttl_seconds,
+    enabled=settings.cache_enabled,
+    flight=question_flight
+)
@@ -1,10 +1,19 @@
 """Настройка базы данных и базовые модели"""
 
+import time
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Dict, List, Optional
 
-from sqlalchemy import func
-from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, create_async_engine
+from fastapi import Request, Response
+from loguru import logger
+from sqlalchemy import func, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncAttrs,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -14,13 +23,46 @@ from sqlalchemy.orm import (
 )
 
 from app.core.config import settings
+from app.core.metrics import InstrumentedAsyncQueuePool, instrument_engine
+
+
+def engine_options(pool_name: str) -> dict:
+    """Параметры движка: пул соединений и драйвер asyncpg.
+
+    Args:
+        pool_name: Имя пула в логах и метриках
+
+    Returns:
+        Аргументы create_async_engine
+    """
+    connect_args = {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        "server_settings": {"application_name": settings.db_application_name},
+    }
+    if settings.db_command_timeout is not None:
+        connect_args["command_timeout"] = settings.db_command_timeout
+
+    return {
+        "echo": settings.debug,
+        "future": True,
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_logging_name": pool_name,
+        "connect_args": connect_args,
+    }
+
 
 # Создание асинхронного движка
 engine = create_async_engine(
     settings.database_url,
-    echo=settings.debug,
-    future=True
+    **engine_options("primary")
 )
+instrument_engine(engine, "primary")
 
 # Фабрика сессий
 async_session_maker = sessionmaker(
@@ -29,6 +71,117 @@ async_session_maker = sessionmaker(
     expire_on_commit=False
 )
 
+
+class ReplicaRouter:
+    """Выбор реплики для читающих запросов.
+
+    Реплики перебираются по кругу (round_robin) или начиная с наименее
+    загруженной по числу выданных соединений (least_connections).
+    Недоступная реплика исключается на replica_retry_seconds.
+    """
+
+    def __init__(
+            self,
+            engines: List[AsyncEngine],
+            balancing: str = "round_robin",
+            retry_seconds: float = 30.0
+    ):
+        """Инициализация маршрутизатора.
+
+        Args:
+            engines: Движки реплик
+            balancing: Стратегия балансировки
+            retry_seconds: Время исключения недоступной реплики
+        """
+        self.engines = engines
+        self.balancing = balancing
+        self.retry_seconds = retry_seconds
+        self.session_makers = {
+            engine: sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            for engine in engines
+        }
+        self._next = 0
+        self._down_until: Dict[AsyncEngine, float] = {}
+
+    def candidates(self) -> List[AsyncEngine]:
+        """Доступные реплики в порядке предпочтения"""
+        now = time.monotonic()
+        healthy = [
+            engine for engine in self.engines
+            if self._down_until.get(engine, 0.0) <= now
+        ]
+        if not healthy:
+            return []
+
+        if self.balancing == "least_connections":
+            return sorted(healthy, key=lambda engine: engine.sync_engine.pool.checkedout())
+
+        start = self._next % len(healthy)
+        self._next += 1
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        """Временно исключить реплику"""
+        self._down_until[engine] = time.monotonic() + self.retry_seconds
+
+
+def _create_replica_engines() -> List[AsyncEngine]:
+    """Создать движки реплик из настроек"""
+    engines = []
+    for index, url in enumerate(settings.database_replica_urls):
+        replica_engine = create_async_engine(url, **engine_options(f"replica{index}"))
+        instrument_engine(replica_engine, f"replica{index}")
+        engines.append(replica_engine)
+    return engines
+
+
+replica_router = ReplicaRouter(
+    _create_replica_engines(),
+    balancing=settings.replica_balancing,
+    retry_seconds=settings.replica_retry_seconds
+)
+
+
+class DatabaseFeatures:
+    """Необязательные расширения базы данных.
+
+    Наличие расширения проверяется один раз при запуске, а если база
+    тогда была недоступна - при первом запросе, которому оно нужно.
+    """
+
+    def __init__(self):
+        """Инициализация: наличие расширений еще не проверено"""
+        self.pg_trgm: Optional[bool] = None
+
+    async def detect(self, db: AsyncSession) -> None:
+        """Проверить установленные расширения.
+
+        Args:
+            db: Сессия базы данных
+        """
+        result = await db.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        )
+        self.pg_trgm = bool(result.scalar())
+        if not self.pg_trgm:
+            logger.warning(
+                "pg_trgm extension is not installed: similar questions search "
+                "and duplicate check are disabled"
+            )
+
+    async def has_pg_trgm(self, db: AsyncSession) -> bool:
+        """Установлено ли расширение pg_trgm.
+
+        Args:
+            db: Сессия базы данных для проверки, если она еще не выполнена
+        """
+        if self.pg_trgm is None:
+            await self.detect(db)
+        return self.pg_trgm
+
+
+database_features = DatabaseFeatures()
+
 # Аннотации для типов
 created_at = Annotated[
     datetime,
@@ -65,4 +218,82 @@ class Base(AsyncAttrs, DeclarativeBase):
 async def get_async_session() -> AsyncSession:
     """Получить асинхронную сессию базы данных"""
     async with async_session_maker() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+def _read_from_primary(request: Request) -> bool:
+    """Нужно ли читать с primary, чтобы клиент увидел свою запись"""
+    if not replica_router.engines:
+        return True
+    try:
+        primary_until = float(request.cookies.get(settings.read_your_writes_cookie, 0))
+    except ValueError:
+        return False
+    return primary_until > time.time()
+
+
+async def get_read_session(request: Request) -> AsyncSession:
+    """Получить сессию для чтения.
+
+    Сессия открывается на реплике, если они настроены. При ошибке
+    подключения реплика временно исключается и пробуется следующая,
+    в крайнем случае используется primary.
+    """
+    if not _read_from_primary(request):
+        for replica_engine in replica_router.candidates():
+            session = replica_router.session_makers[replica_engine]()
+            try:
+                await session.connection()
+            except (DBAPIError, OSError) as e:
+                await session.close()
+                replica_router.mark_down(replica_engine)
+                logger.warning(f"Replica {replica_engine.url.host} is unavailable: {e}")
+                continue
+            async with session:
+                yield session
+            return
+
+    async with async_session_maker() as session:
+        yield session
+
+
+def get_read_session_maker(request: Request) -> sessionmaker:
+    """Получить фабрику сессий для чтения дольше самого запроса.
+
+    Реплика выбирается без проверки подключения, исключаются только
+    уже помеченные недоступными.
+    """
+    if not _read_from_primary(request):
+        candidates = replica_router.candidates()
+        if candidates:
+            return replica_router.session_makers[candidates[0]]
+    return async_session_maker
+
+
+def track_writes(request: Request, response: Response) -> None:
+    """Закрепить чтения клиента за primary после записи.
+
+    Ставит cookie на read_your_writes_seconds после любого изменяющего
+    запроса, чтобы следующие чтения не попали на отстающую реплику.
+    """
+    if (
+        request.method not in ("GET", "HEAD", "OPTIONS")
+        and replica_router.engines
+        and settings.read_your_writes_seconds > 0
+    ):
+        response.set_cookie(
+            settings.read_your_writes_cookie,
+            str(time.time() + settings.read_your_writes_seconds),
+            max_age=int(settings.read_your_writes_seconds) + 1,
+            httponly=True
+        )
+
+
+def get_session_maker() -> sessionmaker:
+    """Получить фабрику сессий.
+
+    Нужна обработчикам, которые работают с базой дольше самого запроса,
+    например потоковым ответам: сессия из get_async_session к этому
+    моменту уже закрыта.
+    """
+    return async_session_maker
@@ -0,0 +1,44 @@
+"""Условные запросы на основе ETag"""
+
+import hashlib
+from typing import Any
+
+from fastapi import Request
+
+
+def make_etag(*parts: Any) -> str:
+    """Построить слабый ETag из версии ресурса.
+
+    Args:
+        parts: Значения, однозначно определяющие версию ресурса
+
+    Returns:
+        Значение заголовка ETag
+    """
+    raw = "|".join(str(part) for part in parts).encode("utf-8")
+    return f'W/"{hashlib.blake2b(raw, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Проверить, совпадает ли ETag с заголовком If-None-Match.
+
+    Сравнение слабое: префикс W/ не учитывается.
+
+    Args:
+        request: HTTP запрос
+        etag: Текущий ETag ресурса
+
+    Returns:
+        True, если клиент уже имеет актуальную версию
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    current = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == current
+        for candidate in header.split(",")
+    )
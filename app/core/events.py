@@ -0,0 +1,333 @@
+"""Поток событий об ответах (Server-Sent Events).
+
+Каждый процесс держит одно выделенное соединение с LISTEN на канале
+answer_events и раздает уведомления подписчикам из памяти, поэтому
+число наблюдателей не влияет на число соединений с базой данных.
+
+У каждого подписчика ограниченная очередь: если клиент не успевает
+читать, он отключается событием evicted, а не задерживает остальных.
+EventSource переподключится сам и должен перечитать вопрос.
+"""
+
+import asyncio
+import json
+from collections import defaultdict
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import asyncpg
+from loguru import logger
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.metrics import (
+    answer_stream_evictions_total,
+    answer_stream_events_total,
+    answer_stream_subscribers,
+)
+from app.crud.answers import answer_crud
+from app.models.models import ANSWER_EVENTS_CHANNEL
+from app.schemas.schemas import AnswerResponse
+
+# Событие в очереди подписчика: кадр SSE и признак последнего события
+Frame = Tuple[str, bool]
+
+# Сколько уведомлений разбирается за один проход
+DISPATCH_BATCH_SIZE = 500
+
+
+def sse_frame(event: str, data: str) -> str:
+    """Сформировать кадр Server-Sent Events"""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def connect_listener() -> asyncpg.Connection:
+    """Открыть соединение для LISTEN вне пула приложения"""
+    return await asyncpg.connect(
+        user=settings.postgres_user,
+        password=settings.postgres_password,
+        host=settings.postgres_host,
+        port=settings.postgres_port,
+        database=settings.postgres_db,
+        server_settings={"application_name": f"{settings.db_application_name}-listener"}
+    )
+
+
+class Subscription:
+    """Подписка на события одного вопроса"""
+
+    def __init__(self, question_id: int, queue_size: int):
+        """Инициализация подписки.
+
+        Args:
+            question_id: ID вопроса
+            queue_size: Максимум непрочитанных событий
+        """
+        self.question_id = question_id
+        self.queue: "asyncio.Queue[Frame]" = asyncio.Queue(queue_size)
+        self.closed = False
+
+
+class AnswerEventHub:
+    """Раздача уведомлений об ответах подписчикам процесса.
+
+    Задача разбора уведомлений запускается start() при старте
+    приложения, а не внутри запроса, чтобы не унаследовать его
+    контекстные переменные (например, статистику запросов к базе).
+    Соединение с LISTEN открывается при первой подписке. Уведомления
+    разбираются этой задачей в порядке поступления; тексты новых
+    ответов загружаются одним запросом на пачку уведомлений и только
+    для вопросов, у которых есть подписчики.
+    """
+
+    def __init__(
+            self,
+            connect: Callable[[], Awaitable[asyncpg.Connection]] = connect_listener,
+            session_maker: sessionmaker = async_session_maker,
+            queue_size: int = 100,
+            max_subscribers: int = 10_000,
+            backlog: int = 10_000
+    ):
+        """Инициализация.
+
+        Args:
+            connect: Функция открытия соединения для LISTEN
+            session_maker: Фабрика сессий для загрузки ответов (primary:
+                реплика может еще не содержать ответ из уведомления)
+            queue_size: Очередь каждого подписчика
+            max_subscribers: Максимум подписчиков процесса
+            backlog: Максимум уведомлений, ожидающих разбора
+        """
+        self.connect = connect
+        self.session_maker = session_maker
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.backlog = backlog
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._count = 0
+        self._connection: Optional[asyncpg.Connection] = None
+        self._notifications: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        """Количество подписчиков"""
+        return self._count
+
+    def start(self) -> None:
+        """Запустить разбор уведомлений"""
+        self._notifications = asyncio.Queue(self.backlog)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def subscribe(self, question_id: int) -> Optional[Subscription]:
+        """Подписаться на события вопроса.
+
+        Args:
+            question_id: ID вопроса
+
+        Returns:
+            Подписка или None, если достигнут лимит подписчиков
+
+        Raises:
+            RuntimeError: Если разбор уведомлений не запущен
+        """
+        if self._dispatcher is None:
+            raise RuntimeError("Answer events hub is not started")
+        if self._count >= self.max_subscribers:
+            return None
+        await self._listen()
+
+        subscription = Subscription(question_id, self.queue_size)
+        self._subscribers[question_id].add(subscription)
+        self._count += 1
+        answer_stream_subscribers.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Отписаться; повторный вызов ничего не делает"""
+        if subscription.closed:
+            return
+        subscription.closed = True
+        subscribers = self._subscribers.get(subscription.question_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.question_id]
+        self._count -= 1
+        answer_stream_subscribers.dec()
+
+    async def stream(
+            self,
+            subscription: Subscription,
+            heartbeat: float
+    ) -> AsyncIterator[str]:
+        """Кадры SSE подписки до ее завершения или отключения клиента.
+
+        Args:
+            subscription: Подписка
+            heartbeat: Интервал keep-alive комментариев в секундах
+
+        Yields:
+            Кадры Server-Sent Events
+        """
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    frame, final = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    # Комментарий не дает прокси закрыть простаивающее соединение
+                    yield ": keep-alive\n\n"
+                    continue
+                yield frame
+                if final:
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+    def publish(self, question_id: int, event: str, data: str, final: bool = False) -> None:
+        """Отправить событие подписчикам вопроса.
+
+        Подписчик с заполненной очередью отключается.
+
+        Args:
+            question_id: ID вопроса
+            event: Имя события
+            data: Данные события (JSON)
+            final: Завершить подписки после события
+        """
+        subscribers = self._subscribers.get(question_id)
+        if not subscribers:
+            return
+
+        frame = sse_frame(event, data)
+        for subscription in list(subscribers):
+            try:
+                subscription.queue.put_nowait((frame, final))
+            except asyncio.QueueFull:
+                self._evict(subscription, "slow_consumer")
+                continue
+            answer_stream_events_total.inc(event)
+            if final:
+                self.unsubscribe(subscription)
+
+    def _evict(self, subscription: Subscription, reason: str) -> None:
+        """Отключить подписчика, заменив его очередь событием evicted"""
+        self.unsubscribe(subscription)
+        answer_stream_evictions_total.inc(reason)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(
+            (sse_frame("evicted", json.dumps({"reason": reason})), True)
+        )
+
+    def _evict_all(self, reason: str) -> None:
+        """Отключить всех подписчиков"""
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                self._evict(subscription, reason)
+
+    async def _listen(self) -> None:
+        """Открыть соединение с LISTEN"""
+        if self._connection is not None:
+            return
+        async with self._lock:
+            if self._connection is not None:
+                return
+            connection = await self.connect()
+            connection.add_termination_listener(self._on_terminate)
+            await connection.add_listener(ANSWER_EVENTS_CHANNEL, self._on_notify)
+            self._connection = connection
+            logger.info(f"Listening for answer events on {ANSWER_EVENTS_CHANNEL!r}")
+
+    def _on_notify(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        """Принять уведомление от asyncpg"""
+        try:
+            self._notifications.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Пропущенные события не восстановить: подписчики
+            # переподключатся и перечитают вопросы
+            logger.warning("Answer events backlog is full, evicting all subscribers")
+            self._evict_all("backlog_full")
+
+    def _on_terminate(self, connection: asyncpg.Connection) -> None:
+        """Соединение с LISTEN потеряно: следующая подписка откроет новое"""
+        if connection is not self._connection:
+            return
+        logger.warning("Answer events listener connection lost")
+        self._connection = None
+        self._evict_all("listener_lost")
+
+    async def _dispatch_loop(self) -> None:
+        """Разбирать уведомления пачками до остановки"""
+        while True:
+            payloads = [await self._notifications.get()]
+            while len(payloads) < DISPATCH_BATCH_SIZE and not self._notifications.empty():
+                payloads.append(self._notifications.get_nowait())
+            try:
+                await self._dispatch(payloads)
+            except Exception as e:
+                logger.error(f"Failed to dispatch answer events: {e}")
+
+    async def _dispatch(self, payloads: List[str]) -> None:
+        """Разослать пачку уведомлений подписчикам"""
+        events = [json.loads(payload) for payload in payloads]
+        created = [
+            event["id"] for event in events
+            if event["event"] == "answer_created" and event["question_id"] in self._subscribers
+        ]
+        answers = {}
+        if created:
+            async with self.session_maker() as db:
+                answers = {row.id: row for row in await answer_crud.get_many(db, created)}
+
+        for event in events:
+            question_id = event["question_id"]
+            if question_id not in self._subscribers:
+                continue
+            if event["event"] == "answer_created":
+                row = answers.get(event["id"])
+                if row is None:
+                    # Ответ удален до загрузки; answer_deleted придет следом
+                    continue
+                data = AnswerResponse.model_validate(row).model_dump_json()
+                self.publish(question_id, "answer_created", data)
+            else:
+                data = json.dumps({"id": event["id"], "question_id": question_id})
+                self.publish(
+                    question_id,
+                    event["event"],
+                    data,
+                    final=event["event"] == "question_deleted"
+                )
+
+    async def stop(self) -> None:
+        """Закрыть соединение и завершить потоки всех подписчиков"""
+        self._evict_all("shutdown")
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            await connection.close()
+
+
+answer_events = AnswerEventHub(
+    queue_size=settings.answer_stream_queue_size,
+    max_subscribers=settings.answer_stream_max_subscribers,
+    backlog=settings.answer_stream_backlog
+)
@@ -1,8 +1,11 @@
 """Обработка исключений приложения"""
 
-from fastapi import Request, status
+from fastapi import HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from loguru import logger
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
 
 
 class AppException(Exception):
@@ -36,6 +39,22 @@ class ValidationError(AppException):
         super().__init__(message, status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
+class ConflictError(AppException):
+    """Исключение для конфликтов с существующими ресурсами"""
+
+    def __init__(self, message: str = "Ресурс уже существует"):
+        """Инициализация исключения"""
+        super().__init__(message, status.HTTP_409_CONFLICT)
+
+
+class FeatureUnavailableError(AppException):
+    """Исключение для функций, недоступных в текущей конфигурации"""
+
+    def __init__(self, message: str = "Функция недоступна"):
+        """Инициализация исключения"""
+        super().__init__(message, status.HTTP_501_NOT_IMPLEMENTED)
+
+
 class DatabaseError(AppException):
     """Исключение для ошибок базы данных"""
 
@@ -70,6 +89,32 @@ async def app_exception_handler(request: Request, exc: AppException):
     )
 
 
+async def pool_timeout_exception_handler(request: Request, exc: PoolTimeoutError):
+    """Обработчик истечения ожидания соединения из пула.
+
+    Пул исчерпан, поэтому клиенту сразу предлагается повторить запрос
+    позже, а не ждать дальше.
+
+    Args:
+        request: HTTP запрос
+        exc: Исключение пула соединений
+
+    Returns:
+        JSON ответ 503 с заголовком Retry-After
+    """
+    logger.warning(f"Database pool timeout on {request.url.path}: {exc}")
+
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "detail": "Сервис перегружен, повторите запрос позже",
+            "status_code": status.HTTP_503_SERVICE_UNAVAILABLE,
+            "path": str(request.url.path)
+        },
+        headers={"Retry-After": str(settings.admission_retry_after_seconds)}
+    )
+
+
 async def general_exception_handler(request: Request, exc: Exception):
     """Обработчик общих исключений.
 
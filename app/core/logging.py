@@ -1,16 +1,26 @@
 """Настройка логирования приложения"""
 
+import random
 import sys
-from typing import Any
+import time
+from typing import Optional
 
 from loguru import logger
-from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
+from app.core.metrics import request_stats
 
 
 def setup_logging() -> None:
-    """Настроить логирование для приложения"""
+    """Настроить логирование для приложения.
+
+    Все обработчики работают с enqueue=True: запись, ротация и сжатие
+    файлов выполняются в фоновом потоке loguru, а не в event loop.
+    """
+
+    # Убираем стандартный синхронный обработчик loguru
+    logger.remove()
 
     # Формат для консоли
     log_format = (
@@ -25,7 +35,9 @@ def setup_logging() -> None:
         sys.stdout,
         format=log_format,
         level="DEBUG" if settings.debug else "INFO",
-        colorize=True,
+        colorize=not settings.log_json,
+        serialize=settings.log_json,
+        enqueue=True,
         backtrace=settings.debug,
         diagnose=settings.debug
     )
@@ -39,6 +51,8 @@ def setup_logging() -> None:
             compression="zip",  # Сжимать старые логи
             level="INFO",
             format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} | {message}",
+            serialize=settings.log_json,
+            enqueue=True,
             backtrace=True,
             diagnose=False
         )
@@ -51,6 +65,8 @@ def setup_logging() -> None:
             compression="zip",
             level="ERROR",
             format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} | {message}",
+            serialize=settings.log_json,
+            enqueue=True,
             backtrace=True,
             diagnose=True
         )
@@ -58,40 +74,87 @@ def setup_logging() -> None:
     logger.info(f"Логирование настроено. Debug mode: {settings.debug}")
 
 
-async def log_request_middleware(request: Request, call_next: Any) -> Any:
-    """Middleware для логирования HTTP запросов.
+class AccessLogMiddleware:
+    """ASGI middleware для журнала HTTP запросов.
 
-    Args:
-        request: HTTP запрос
-        call_next: Следующий обработчик
-
-    Returns:
-        HTTP ответ
+    Пишет одну запись на запрос после отправки ответа. Успешные (2xx)
+    запросы попадают в журнал с вероятностью log_access_sample_rate,
+    остальные - всегда. Сама запись уходит в очередь loguru и не
+    блокирует event loop.
     """
-    # Получаем IP клиента
-    client_ip = request.client.host if request.client else "unknown"
-
-    # Логируем входящий запрос
-    logger.info(
-        f"{request.method} {request.url.path} | "
-        f"Client: {client_ip}"
-    )
 
-    # Обрабатываем запрос
-    try:
-        response = await call_next(request)
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None):
+        """Инициализация middleware.
 
-        # Логируем успешный ответ
-        logger.info(
-            f"{request.method} {request.url.path} | "
-            f"Status: {response.status_code}"
+        Args:
+            app: ASGI приложение
+            sample_rate: Доля успешных запросов, попадающих в журнал
+        """
+        self.app = app
+        self.sample_rate = (
+            settings.log_access_sample_rate if sample_rate is None else sample_rate
         )
 
-        return response
-    except Exception as e:
-        # Логируем ошибку
-        logger.error(
-            f"{request.method} {request.url.path} | "
-            f"Error: {str(e)}"
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработать запрос"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            self._log(scope, status_code, start, error=e)
+            raise
+
+        if not 200 <= status_code < 300 or random.random() < self.sample_rate:
+            self._log(scope, status_code, start)
+
+    @staticmethod
+    def _log(
+            scope: Scope,
+            status_code: int,
+            start: float,
+            error: Optional[Exception] = None
+    ) -> None:
+        """Записать запрос в журнал"""
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        method = scope["method"]
+        path = scope["path"]
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        fields = dict(
+            method=method,
+            path=path,
+            status=status_code,
+            duration_ms=round(duration_ms, 2),
+            client=client_ip
         )
-        raise
\ No newline at end of file
+        db_info = ""
+        stats = request_stats.get()
+        if stats is not None:
+            fields.update(
+                db_queries=stats.queries,
+                db_rows=stats.rows,
+                db_ms=round(stats.db_time * 1000, 2)
+            )
+            db_info = f" | DB: {stats.queries} queries, {stats.db_time * 1000:.1f} ms"
+
+        access_logger = logger.bind(**fields)
+        if error is not None:
+            access_logger.error(f"{method} {path} | Error: {error}")
+        else:
+            access_logger.info(
+                f"{method} {path} | Status: {status_code} | "
+                f"{duration_ms:.1f} ms{db_info} | Client: {client_ip}"
+            )
@@ -0,0 +1,510 @@
+"""Метрики HTTP запросов в формате Prometheus"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Границы корзин гистограмм по умолчанию
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    """Сформировать набор меток в формате Prometheus"""
+    pairs = [
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Сформировать значение метрики"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Монотонно растущий счетчик"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        """Инициализация счетчика"""
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        """Увеличить счетчик"""
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Получить значение счетчика"""
+        return self._values.get(label_values, 0)
+
+    def samples(self) -> List[str]:
+        """Строки значений для экспозиции"""
+        return [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+            for values, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """Значение, которое может как расти, так и уменьшаться"""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        """Уменьшить значение"""
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values: str, value: float) -> None:
+        """Установить значение"""
+        self._values[label_values] = value
+
+
+class CallbackGauge:
+    """Значения, вычисляемые в момент экспозиции"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        """Инициализация метрики"""
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._callbacks: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set_function(self, callback: Callable[[], float], *label_values: str) -> None:
+        """Задать функцию, возвращающую текущее значение"""
+        self._callbacks[label_values] = callback
+
+    def samples(self) -> List[str]:
+        """Строки значений для экспозиции"""
+        return [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(callback())}"
+            for values, callback in self._callbacks.items()
+        ]
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами.
+
+    Наблюдение стоит одного двоичного поиска по границам корзин;
+    накопительные значения считаются только при экспозиции.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labels: Sequence[str] = (),
+            buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        """Инициализация гистограммы"""
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Для каждого набора меток: [счетчики корзин..., +Inf], сумма
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Добавить наблюдение"""
+        item = self._values.get(label_values)
+        if item is None:
+            item = ([0] * (len(self.buckets) + 1), [0.0])
+            self._values[label_values] = item
+        counts, total = item
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def count(self, *label_values: str) -> int:
+        """Количество наблюдений"""
+        item = self._values.get(label_values)
+        return sum(item[0]) if item else 0
+
+    def samples(self) -> List[str]:
+        """Строки значений для экспозиции"""
+        lines = []
+        for values, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labels, values, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Набор метрик процесса"""
+
+    def __init__(self):
+        """Инициализация реестра"""
+        self._metrics = []
+
+    def register(self, metric):
+        """Зарегистрировать метрику"""
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Сформировать текстовую экспозицию Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total",
+    "Количество обработанных HTTP запросов",
+    ("method", "route", "status")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "Количество HTTP запросов в обработке",
+    ("method",)
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP запроса",
+    ("method", "route")
+))
+http_response_size_bytes = registry.register(Histogram(
+    "http_response_size_bytes",
+    "Размер тела HTTP ответа",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS
+))
+http_request_db_seconds = registry.register(Histogram(
+    "http_request_db_seconds",
+    "Время выполнения SQL запросов за один HTTP запрос",
+    ("method", "route")
+))
+
+
+db_pool_size = registry.register(CallbackGauge(
+    "db_pool_size",
+    "Размер пула соединений без учета overflow",
+    ("pool",)
+))
+db_pool_checked_out = registry.register(CallbackGauge(
+    "db_pool_checked_out",
+    "Количество выданных из пула соединений",
+    ("pool",)
+))
+db_pool_checked_in = registry.register(CallbackGauge(
+    "db_pool_checked_in",
+    "Количество свободных соединений в пуле",
+    ("pool",)
+))
+db_pool_overflow = registry.register(CallbackGauge(
+    "db_pool_overflow",
+    "Количество соединений сверх pool_size (отрицательное - незаполненный пул)",
+    ("pool",)
+))
+db_pool_wait_seconds = registry.register(Histogram(
+    "db_pool_wait_seconds",
+    "Время ожидания соединения из пула, включая установку нового",
+    ("pool",)
+))
+db_pool_timeouts_total = registry.register(Counter(
+    "db_pool_timeouts_total",
+    "Количество ожиданий соединения, завершившихся по pool_timeout",
+    ("pool",)
+))
+db_pool_connects_total = registry.register(Counter(
+    "db_pool_connects_total",
+    "Количество установленных соединений с базой данных",
+    ("pool",)
+))
+db_pool_disconnects_total = registry.register(Counter(
+    "db_pool_disconnects_total",
+    "Количество закрытых соединений с базой данных",
+    ("pool",)
+))
+
+admission_in_flight = registry.register(Gauge(
+    "admission_in_flight",
+    "Количество запросов, допущенных к обработке",
+    ("route_class",)
+))
+admission_waiting = registry.register(Gauge(
+    "admission_waiting",
+    "Количество запросов в очереди на допуск",
+    ("route_class",)
+))
+admission_rejected_total = registry.register(Counter(
+    "admission_rejected_total",
+    "Количество запросов, отклоненных с 503 или 429",
+    ("route_class", "reason")
+))
+
+singleflight_calls_total = registry.register(Counter(
+    "singleflight_calls_total",
+    "Вызовы single-flight: leader выполняет загрузку, follower ждет ее результата",
+    ("name", "role")
+))
+
+answer_stream_subscribers = registry.register(Gauge(
+    "answer_stream_subscribers",
+    "Количество подписчиков потока ответов"
+))
+answer_stream_events_total = registry.register(Counter(
+    "answer_stream_events_total",
+    "Количество событий, отправленных подписчикам потока ответов",
+    ("event",)
+))
+answer_stream_evictions_total = registry.register(Counter(
+    "answer_stream_evictions_total",
+    "Количество подписчиков, отключенных из-за переполнения очереди",
+    ("reason",)
+))
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, измеряющий время ожидания соединения.
+
+    Имя пула для меток берется из pool_logging_name движка.
+    """
+
+    def _do_get(self):
+        """Получить соединение из пула"""
+        pool_name = self._orig_logging_name or "default"
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            db_pool_timeouts_total.inc(pool_name)
+            raise
+        finally:
+            db_pool_wait_seconds.observe(time.perf_counter() - start, pool_name)
+
+
+def instrument_engine(engine: AsyncEngine, pool_name: str) -> None:
+    """Публиковать статистику пула соединений движка.
+
+    Args:
+        engine: Асинхронный движок
+        pool_name: Значение метки pool
+    """
+    sync_engine = engine.sync_engine
+    db_pool_size.set_function(lambda: sync_engine.pool.size(), pool_name)
+    db_pool_checked_out.set_function(lambda: sync_engine.pool.checkedout(), pool_name)
+    db_pool_checked_in.set_function(lambda: sync_engine.pool.checkedin(), pool_name)
+    db_pool_overflow.set_function(lambda: sync_engine.pool.overflow(), pool_name)
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        db_pool_connects_total.inc(pool_name)
+
+    @event.listens_for(sync_engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        db_pool_disconnects_total.inc(pool_name)
+
+
+def pool_status(engine: AsyncEngine) -> Dict[str, int]:
+    """Текущее состояние пула соединений движка"""
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow()
+    }
+
+
+@dataclass
+class RequestStats:
+    """Статистика работы с базой данных в рамках одного запроса"""
+
+    db_time: float = 0.0
+    queries: int = 0
+    rows: int = 0
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing"""
+        return (
+            f'db;dur={self.db_time * 1000:.1f};'
+            f'desc="{self.queries} queries, {self.rows} rows"'
+        )
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def bind_request_stats() -> Tuple[RequestStats, Optional[Token]]:
+    """Получить статистику текущего запроса, создав ее при отсутствии.
+
+    Returns:
+        Статистика и токен для сброса ContextVar; токен равен None,
+        если статистику создал внешний слой
+    """
+    stats = request_stats.get()
+    if stats is not None:
+        return stats, None
+    stats = RequestStats()
+    return stats, request_stats.set(stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Запомнить время начала SQL запроса"""
+    if request_stats.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Учесть SQL запрос в статистике текущего HTTP запроса"""
+    stats = request_stats.get()
+    starts = conn.info.get("query_start")
+    if stats is not None and starts:
+        stats.db_time += time.perf_counter() - starts.pop()
+        stats.queries += 1
+        # Для серверных курсоров количество строк неизвестно (-1)
+        stats.rows += max(cursor.rowcount, 0)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    """Сбросить время начала SQL запроса, завершившегося ошибкой"""
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+class PrometheusMiddleware:
+    """ASGI middleware, собирающий метрики HTTP запросов.
+
+    Метки маршрута берутся из шаблона пути (например
+    /questions/{question_id}), чтобы не плодить ряды на каждый ID.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Инициализация middleware"""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработать запрос"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        stats, token = bind_request_stats()
+        http_requests_in_flight.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            http_requests_in_flight.dec(method)
+            if token is not None:
+                request_stats.reset(token)
+
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_requests_total.inc(method, route_path, str(status_code))
+            http_request_duration_seconds.observe(duration, method, route_path)
+            http_response_size_bytes.observe(response_size, method, route_path)
+            http_request_db_seconds.observe(stats.db_time, method, route_path)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware, считающий SQL запросы каждого HTTP запроса.
+
+    Количество запросов, строк и время в базе данных отдаются клиенту
+    в заголовках Server-Timing и X-DB-Queries. Запросы, выполнившие
+    больше warn_threshold SQL запросов, попадают в журнал: обычно это
+    признак N+1.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            headers: bool = True,
+            warn_threshold: Optional[int] = None
+    ):
+        """Инициализация middleware.
+
+        Args:
+            app: ASGI приложение
+            headers: Добавлять ли заголовки со статистикой в ответ
+            warn_threshold: Количество SQL запросов, начиная с которого
+                запрос логируется как подозрительный; None - не логировать
+        """
+        self.app = app
+        self.headers = headers
+        self.warn_threshold = warn_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Обработать запрос"""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = bind_request_stats()
+
+        async def send_wrapper(message: Message) -> None:
+            if self.headers and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+                headers.append("X-DB-Queries", str(stats.queries))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if token is not None:
+                request_stats.reset(token)
+            if self.warn_threshold is not None and stats.queries > self.warn_threshold:
+                logger.warning(
+                    f"{scope['method']} {scope['path']} executed {stats.queries} "
+                    f"SQL queries ({stats.rows} rows, {stats.db_time * 1000:.1f} ms)"
+                )
@@ -0,0 +1,57 @@
+"""Курсорная (keyset) пагинация"""
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional, Tuple
+
+from app.core.exceptions import ValidationError
+
+# Позиция в выборке: (created_at, id) последней отданной записи
+Cursor = Tuple[datetime, int]
+
+# Наибольший ID записи (колонки id имеют тип integer)
+MAX_ID = 2 ** 31 - 1
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Закодировать позицию в непрозрачный курсор.
+
+    Args:
+        created_at: Время создания последней записи страницы
+        item_id: ID последней записи страницы
+
+    Returns:
+        Курсор в виде base64url-строки
+    """
+    raw = f"{created_at.isoformat()}|{item_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Раскодировать курсор, полученный от клиента.
+
+    Args:
+        cursor: Курсор из параметров запроса
+
+    Returns:
+        Позиция (created_at, id) или None, если курсор не передан
+
+    Raises:
+        ValidationError: Если курсор поврежден
+    """
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at, item_id = raw.split("|", 1)
+        position = datetime.fromisoformat(created_at), int(item_id)
+        # Колонки created_at без часового пояса, а id - integer: иначе
+        # сравнение с курсором завершилось бы ошибкой базы данных
+        if position[0].tzinfo is not None or not 1 <= position[1] <= MAX_ID:
+            raise ValueError(raw)
+        return position
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValidationError("Некорректный курсор пагинации")
@@ -0,0 +1,119 @@
+"""Быстрая сериализация ответов API.
+
+Маршрут, возвращающий экземпляр Response, FastAPI отдает как есть: без
+повторной валидации по response_model и без jsonable_encoder. Эндпоинты
+с большими ответами собирают схему сами и возвращают FastJSONResponse,
+а response_model остается только для документации OpenAPI.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+from app.schemas.schemas import (
+    AnswerPaginatedResponse,
+    AnswerResponse,
+    HotQuestion,
+    PaginatedResponse,
+    QuestionResponse,
+    QuestionWithAnswers,
+    SearchResponse,
+    UserAnswersResponse,
+)
+
+
+@lru_cache(maxsize=None)
+def serializer(schema: Any) -> TypeAdapter:
+    """Получить TypeAdapter для типа, построив его один раз.
+
+    Args:
+        schema: Схема или тип (например List[AnswerResponse])
+
+    Returns:
+        Закэшированный TypeAdapter
+    """
+    return TypeAdapter(schema)
+
+
+# Сериализаторы схем ответов строятся при импорте, а не на первом запросе
+for _schema in (
+        AnswerResponse,
+        List[AnswerResponse],
+        AnswerPaginatedResponse,
+        QuestionResponse,
+        List[QuestionResponse],
+        List[HotQuestion],
+        QuestionWithAnswers,
+        PaginatedResponse,
+        SearchResponse,
+        UserAnswersResponse,
+):
+    serializer(_schema)
+
+
+def _default(value: Any) -> Any:
+    """Преобразовать значения, которые orjson не сериализует сам"""
+    if isinstance(value, BaseModel):
+        return serializer(type(value)).dump_python(value, mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dump_json(value: Any, schema: Optional[Any] = None) -> bytes:
+    """Сериализовать значение в JSON.
+
+    Схемы сериализуются своим TypeAdapter без валидации, остальные
+    значения - через orjson.
+
+    Args:
+        value: Значение
+        schema: Тип значения для TypeAdapter; по умолчанию тип схемы
+
+    Returns:
+        JSON в байтах
+    """
+    if schema is not None:
+        return serializer(schema).dump_json(value)
+    if isinstance(value, BaseModel):
+        return serializer(type(value)).dump_json(value)
+    return orjson.dumps(value, default=_default)
+
+
+class FastJSONResponse(Response):
+    """JSON ответ на основе TypeAdapter и orjson.
+
+    Содержимое не валидируется: ожидается схема, собранная приложением,
+    или данные из простых типов.
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+            self,
+            content: Any,
+            status_code: int = 200,
+            headers: Optional[Dict[str, str]] = None,
+            schema: Optional[Any] = None,
+            background: Optional[BackgroundTask] = None
+    ):
+        """Инициализация ответа.
+
+        Args:
+            content: Схема ответа, готовые байты JSON или простые данные
+            status_code: HTTP статус код
+            headers: Дополнительные заголовки
+            schema: Тип содержимого, если это не экземпляр схемы
+                (например List[AnswerResponse])
+            background: Фоновая задача после отправки ответа
+        """
+        self.schema = schema
+        super().__init__(content, status_code, headers, background=background)
+
+    def render(self, content: Any) -> bytes:
+        """Сериализовать содержимое"""
+        if isinstance(content, bytes):
+            return content
+        return dump_json(content, self.schema)
@@ -0,0 +1,85 @@
+"""Объединение одинаковых одновременных загрузок (single-flight)"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from app.core.metrics import singleflight_calls_total
+
+
+class SingleFlight:
+    """Выполняет не больше одной загрузки на ключ одновременно.
+
+    Первый вызов по ключу (leader) запускает загрузку отдельной задачей,
+    остальные вызовы (followers), пришедшие до ее завершения, получают
+    тот же результат или то же исключение. После завершения ключ
+    освобождается, поэтому следующие вызовы запускают новую загрузку и
+    не получают устаревших данных.
+
+    Загрузка выполняется в задаче, поэтому отмена одного из ожидающих
+    запросов (например, разрыв соединения клиентом) не отменяет ее для
+    остальных.
+    """
+
+    def __init__(self, name: str):
+        """Инициализация.
+
+        Args:
+            name: Имя для метрик
+        """
+        self.name = name
+        self.leaders = 0
+        self.followers = 0
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполнить загрузку или присоединиться к уже идущей.
+
+        Args:
+            key: Ключ загрузки
+            loader: Функция загрузки
+
+        Returns:
+            Результат загрузки
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            singleflight_calls_total.inc(self.name, "leader")
+            task = asyncio.ensure_future(loader())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.followers += 1
+            singleflight_calls_total.inc(self.name, "follower")
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Освободить ключ завершившейся загрузки"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Исключение уже получили ожидающие; не даем asyncio
+            # сообщать о нем как о необработанном
+            task.exception()
+
+    def forget(self, key: str) -> None:
+        """Не присоединять новые вызовы к идущей загрузке.
+
+        Вызывается при изменении данных: загрузка могла прочитать их до
+        изменения, поэтому следующие запросы должны загрузить их заново.
+        """
+        self._calls.pop(key, None)
+
+    def clear(self) -> None:
+        """Не присоединять новые вызовы ни к одной идущей загрузке"""
+        self._calls.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Счетчики и доля объединенных вызовов"""
+        total = self.leaders + self.followers
+        return {
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "in_flight": len(self._calls),
+            "coalescing_ratio": round(self.followers / total, 4) if total else 0.0
+        }
@@ -1,13 +1,24 @@
 """CRUD операции для ответов"""
 
-from typing import Optional
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
-from sqlalchemy import select
+from loguru import logger
+from sqlalchemy import Row, delete, func, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app.models.models import Answer
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.pagination import Cursor
+from app.models.models import Answer, Question
 from app.schemas.schemas import AnswerCreate
 
+# SQLSTATE нарушения внешнего ключа
+FOREIGN_KEY_VIOLATION = "23503"
+
 
 class AnswerCRUD:
     """CRUD операции для работы с ответами"""
@@ -17,17 +28,82 @@ class AnswerCRUD:
             db: AsyncSession,
             answer_data: AnswerCreate,
             question_id: int
-    ) -> Answer:
-        """Создать новый ответ на вопрос"""
-        answer = Answer(
-            **answer_data.model_dump(),
-            question_id=question_id
-        )
-        db.add(answer)
+    ) -> Optional[Row]:
+        """Создать новый ответ на вопрос.
+
+        Ответ вставляется одним INSERT ... RETURNING без предварительной
+        проверки вопроса: его отсутствие обнаруживает внешний ключ. Если
+        запущен answer_batcher, ответ записывается в его пачке, а вызов
+        завершается после ее коммита.
+
+        Args:
+            db: Сессия базы данных
+            answer_data: Данные ответа
+            question_id: ID вопроса
+
+        Returns:
+            Строка с полями AnswerResponse или None, если вопроса нет
+        """
+        if answer_batcher.running:
+            return await answer_batcher.submit(answer_data, question_id)
+
+        try:
+            result = await db.execute(
+                insert(Answer)
+                .values(**answer_data.model_dump(), question_id=question_id)
+                .returning(
+                    Answer.id,
+                    Answer.question_id,
+                    Answer.user_id,
+                    Answer.text,
+                    Answer.created_at,
+                    Answer.updated_at
+                )
+            )
+        except IntegrityError as e:
+            await db.rollback()
+            if getattr(e.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION:
+                return None
+            raise
+
+        answer = result.one()
         await db.commit()
-        await db.refresh(answer)
         return answer
 
+    @staticmethod
+    async def create_many(
+            db: AsyncSession,
+            answers_data: List[AnswerCreate],
+            question_id: int
+    ) -> List[Row]:
+        """Создать несколько ответов на вопрос в одной транзакции.
+
+        Каждая пачка из bulk_chunk_size ответов вставляется одним
+        многострочным INSERT ... RETURNING.
+        """
+        created = []
+        chunk_size = settings.bulk_chunk_size
+        for start in range(0, len(answers_data), chunk_size):
+            chunk = answers_data[start:start + chunk_size]
+            result = await db.execute(
+                insert(Answer)
+                .values([
+                    {**item.model_dump(), "question_id": question_id}
+                    for item in chunk
+                ])
+                .returning(
+                    Answer.id,
+                    Answer.question_id,
+                    Answer.user_id,
+                    Answer.text,
+                    Answer.created_at,
+                    Answer.updated_at
+                )
+            )
+            created.extend(result.all())
+        await db.commit()
+        return created
+
     @staticmethod
     async def get_by_id(
             db: AsyncSession,
@@ -39,14 +115,358 @@ class AnswerCRUD:
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_page(
+            db: AsyncSession,
+            question_id: int,
+            limit: int,
+            after: Optional[Cursor] = None
+    ) -> List[Row]:
+        """Получить страницу ответов на вопрос, начиная после курсора.
+
+        Порядок (created_at, id) обслуживается индексом
+        ix_answers_question_id_created_at_id, поэтому стоимость запроса
+        не зависит ни от номера страницы, ни от числа ответов.
+
+        Args:
+            db: Сессия базы данных
+            question_id: ID вопроса
+            limit: Максимальное количество ответов
+            after: Позиция последнего ответа предыдущей страницы
+
+        Returns:
+            Список строк с полями AnswerResponse
+        """
+        query = (
+            select(
+                Answer.id,
+                Answer.question_id,
+                Answer.user_id,
+                Answer.text,
+                Answer.created_at,
+                Answer.updated_at
+            )
+            .where(Answer.question_id == question_id)
+            .order_by(Answer.created_at, Answer.id)
+        )
+        if after is not None:
+            query = query.where(tuple_(Answer.created_at, Answer.id) > tuple_(*after))
+        result = await db.execute(query.limit(limit))
+        return result.all()
+
+    @staticmethod
+    async def get_user_page(
+            db: AsyncSession,
+            user_id: str,
+            limit: int,
+            after: Optional[Cursor] = None
+    ) -> List[Row]:
+        """Получить страницу ответов пользователя, начиная после курсора.
+
+        Порядок (created_at desc, id desc) обслуживается индексом
+        ix_answers_user_id_created_at_id, поэтому стоимость страницы не
+        зависит от числа ответов пользователя.
+
+        Args:
+            db: Сессия базы данных
+            user_id: Идентификатор пользователя
+            limit: Максимальное количество ответов
+            after: Позиция последнего ответа предыдущей страницы
+
+        Returns:
+            Список строк с полями AnswerResponse
+        """
+        query = (
+            select(
+                Answer.id,
+                Answer.question_id,
+                Answer.user_id,
+                Answer.text,
+                Answer.created_at,
+                Answer.updated_at
+            )
+            .where(Answer.user_id == user_id)
+            .order_by(Answer.created_at.desc(), Answer.id.desc())
+        )
+        if after is not None:
+            query = query.where(tuple_(Answer.created_at, Answer.id) < tuple_(*after))
+        result = await db.execute(query.limit(limit))
+        return result.all()
+
+    @staticmethod
+    async def get_user_stats(
+            db: AsyncSession,
+            user_id: str
+    ) -> Row:
+        """Получить количество ответов пользователя и отвеченных вопросов.
+
+        Считается сканированием только индекса
+        ix_answers_user_id_created_at_id.
+
+        Returns:
+            Строка (total, questions_answered)
+        """
+        result = await db.execute(
+            select(
+                func.count().label("total"),
+                func.count(Answer.question_id.distinct()).label("questions_answered")
+            )
+            .where(Answer.user_id == user_id)
+        )
+        return result.one()
+
+    @staticmethod
+    async def count(
+            db: AsyncSession,
+            question_id: int
+    ) -> int:
+        """Количество ответов на вопрос.
+
+        Читается из questions.answer_count, который поддерживают триггеры
+        активности: одно чтение по первичному ключу вместо подсчета всех
+        ответов вопроса.
+        """
+        result = await db.execute(
+            select(Question.answer_count).where(Question.id == question_id)
+        )
+        return result.scalar() or 0
+
+    @staticmethod
+    async def get_many(
+            db: AsyncSession,
+            answer_ids: Sequence[int]
+    ) -> List[Row]:
+        """Получить ответы по списку ID одним запросом.
+
+        Returns:
+            Строки с полями AnswerResponse; удаленных ответов среди них нет
+        """
+        if not answer_ids:
+            return []
+
+        result = await db.execute(
+            select(
+                Answer.id,
+                Answer.question_id,
+                Answer.user_id,
+                Answer.text,
+                Answer.created_at,
+                Answer.updated_at
+            )
+            .where(Answer.id.in_(answer_ids))
+            .order_by(Answer.id)
+        )
+        return result.all()
+
+    @staticmethod
+    async def get_for_questions(
+            db: AsyncSession,
+            question_ids: Sequence[int]
+    ) -> List[Row]:
+        """Получить ответы на несколько вопросов одним запросом.
+
+        Возвращаются строки с полями AnswerResponse, упорядоченные по
+        вопросу и времени создания.
+        """
+        if not question_ids:
+            return []
+
+        result = await db.execute(
+            select(
+                Answer.id,
+                Answer.question_id,
+                Answer.user_id,
+                Answer.text,
+                Answer.created_at,
+                Answer.updated_at
+            )
+            .where(Answer.question_id.in_(question_ids))
+            .order_by(Answer.question_id, Answer.created_at, Answer.id)
+        )
+        return result.all()
+
     @staticmethod
     async def delete(
             db: AsyncSession,
-            answer: Answer
-    ) -> None:
-        """Удалить ответ"""
-        await db.delete(answer)
+            answer_id: int
+    ) -> Optional[int]:
+        """Удалить ответ одним запросом.
+
+        Returns:
+            ID вопроса удаленного ответа или None, если ответа нет
+        """
+        result = await db.execute(
+            delete(Answer)
+            .where(Answer.id == answer_id)
+            .returning(Answer.question_id)
+            .execution_options(synchronize_session=False)
+        )
+        question_id = result.scalar_one_or_none()
         await db.commit()
+        return question_id
+
+
+# Ответ в очереди: значения колонок и future вызывающего
+PendingAnswer = Tuple[Dict[str, Any], asyncio.Future]
+
+
+def _correlation_key(values: Mapping[str, Any]) -> Tuple[Any, ...]:
+    """Ключ сопоставления ответа в очереди со строкой RETURNING"""
+    return values["question_id"], values["user_id"], values["text"]
+
+
+class AnswerBatcher:
+    """Пакетная запись ответов (write-behind).
+
+    Ответы из очереди записываются фоновой задачей одним многострочным
+    INSERT ... RETURNING на пачку и одним коммитом. Пачка закрывается по
+    размеру или по истечении max_delay после первого ответа в ней.
+    Future каждого вызывающего завершается только после коммита пачки,
+    поэтому ответ 201 по-прежнему означает, что ответ сохранен.
+    """
+
+    def __init__(
+            self,
+            session_maker: sessionmaker,
+            max_size: int,
+            max_delay: float,
+            queue_size: int
+    ):
+        """Инициализация.
+
+        Args:
+            session_maker: Фабрика сессий primary
+            max_size: Максимум ответов в пачке
+            max_delay: Максимальное ожидание заполнения пачки в секундах
+            queue_size: Емкость очереди; при заполнении submit ждет
+        """
+        self.session_maker = session_maker
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.batches = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Запущена ли фоновая запись"""
+        return self._task is not None
+
+    def start(self) -> None:
+        """Запустить фоновую запись"""
+        self._queue = asyncio.Queue(self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Записать оставшиеся ответы и остановить фоновую запись"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        await self._queue.join()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def submit(self, answer_data: AnswerCreate, question_id: int) -> Optional[Row]:
+        """Поставить ответ в очередь и дождаться коммита его пачки.
+
+        Returns:
+            Строка с полями AnswerResponse или None, если вопроса нет
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(({**answer_data.model_dump(), "question_id": question_id}, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Собирать пачки из очереди и записывать их"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[PendingAnswer] = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error(f"Answer batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[PendingAnswer]) -> None:
+        """Записать пачку одним INSERT и одним коммитом.
+
+        Если какого-то вопроса нет, вставка всей пачки нарушает внешний
+        ключ; тогда ответы на отсутствующие вопросы отбрасываются с
+        результатом None, а остальные вставляются повторно.
+        """
+        async with self.session_maker() as db:
+            while batch:
+                try:
+                    result = await db.execute(
+                        insert(Answer)
+                        .values([values for values, _ in batch])
+                        .returning(
+                            Answer.id,
+                            Answer.question_id,
+                            Answer.user_id,
+                            Answer.text,
+                            Answer.created_at,
+                            Answer.updated_at
+                        )
+                    )
+                    rows = result.all()
+                    await db.commit()
+                except IntegrityError as e:
+                    await db.rollback()
+                    if getattr(e.orig, "sqlstate", None) != FOREIGN_KEY_VIOLATION:
+                        raise
+                    existing = set((await db.execute(
+                        select(Question.id).where(
+                            Question.id.in_({values["question_id"] for values, _ in batch})
+                        )
+                    )).scalars())
+                    await db.rollback()
+                    for values, future in batch:
+                        if values["question_id"] not in existing and not future.done():
+                            future.set_result(None)
+                    batch = [item for item in batch if item[0]["question_id"] in existing]
+                    continue
+
+                self.batches += 1
+                # Порядок строк RETURNING не гарантирован, поэтому строки
+                # сопоставляются вызывающим по вставленным значениям.
+                # Одинаковые ответы в пачке неразличимы, и каждый из их
+                # вызывающих получает свою строку
+                waiting = defaultdict(list)
+                for values, future in batch:
+                    waiting[_correlation_key(values)].append(future)
+                for row in rows:
+                    future = waiting[_correlation_key(row._mapping)].pop(0)
+                    if not future.done():
+                        future.set_result(row)
+                return
+
 
+answer_crud = AnswerCRUD()
 
-answer_crud = AnswerCRUD()
\ No newline at end of file
+# Пакетная запись ответов; запускается в lifespan при answer_batching_enabled
+answer_batcher = AnswerBatcher(
+    async_session_maker,
+    settings.answer_batch_max_size,
+    settings.answer_batch_max_delay_seconds,
+    settings.answer_batch_queue_size
+)
\ No newline at end of file
@@ -1,70 +1,460 @@
 """CRUD операции для вопросов"""
 
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import Row, cast, delete, exists, func, insert, literal, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.models import Question
+from app.core.config import settings
+from app.core.exceptions import ConflictError
+from app.core.pagination import Cursor
+from app.models.models import HOT_SCORE_DECAY_SECONDS, Answer, Question, stats_counters
 from app.schemas.schemas import QuestionCreate
 
 
+def search_config():
+    """Конфигурация текстового поиска из настроек"""
+    return cast(literal(settings.search_language), REGCONFIG)
+
+
+# Разметка совпадений в подсветке
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15"
+
+
 class QuestionCRUD:
     """CRUD операции для работы с вопросами"""
 
+    @staticmethod
+    async def find_similar(
+            db: AsyncSession,
+            text: str,
+            threshold: float = settings.similar_questions_threshold,
+            limit: int = settings.similar_questions_limit
+    ) -> List[Row]:
+        """Найти вопросы, похожие на текст, по триграммному сходству.
+
+        Отбор выполняет оператор %, который обслуживается индексом
+        ix_questions_text_trgm; его порог задается на время транзакции.
+        Сходство считается только для отобранных кандидатов.
+
+        Args:
+            db: Сессия базы данных
+            text: Текст для сравнения
+            threshold: Минимальное сходство от 0 до 1
+            limit: Максимальное количество кандидатов
+
+        Returns:
+            Строки (id, text, similarity) по убыванию сходства
+        """
+        await db.execute(
+            select(func.set_config("pg_trgm.similarity_threshold", str(threshold), True))
+        )
+        similarity = func.similarity(Question.text, text).label("similarity")
+        result = await db.execute(
+            select(Question.id, Question.text, similarity)
+            .where(Question.text.op("%")(text))
+            .order_by(similarity.desc(), Question.id.desc())
+            .limit(limit)
+        )
+        return result.all()
+
     @staticmethod
     async def create(
             db: AsyncSession,
-            question_data: QuestionCreate
-    ) -> Question:
-        """Создать новый вопрос"""
-        question = Question(**question_data.model_dump())
-        db.add(question)
+            question_data: QuestionCreate,
+            duplicate_threshold: Optional[float] = None
+    ) -> Row:
+        """Создать новый вопрос.
+
+        Вопрос вставляется одним INSERT ... RETURNING, который сразу
+        возвращает значения, заполненные базой данных.
+
+        Args:
+            db: Сессия базы данных
+            question_data: Данные вопроса
+            duplicate_threshold: Сходство, начиная с которого вопрос
+                считается дубликатом существующего; None - не проверять
+
+        Returns:
+            Строка с полями QuestionResponse
+
+        Raises:
+            ConflictError: Если найден похожий вопрос
+        """
+        if duplicate_threshold is not None:
+            duplicates = await QuestionCRUD.find_similar(
+                db, question_data.text, duplicate_threshold
+            )
+            if duplicates:
+                ids = ", ".join(str(row.id) for row in duplicates)
+                raise ConflictError(f"Похожие вопросы уже существуют: {ids}")
+
+        result = await db.execute(
+            insert(Question)
+            .values(**question_data.model_dump())
+            .returning(
+                Question.id,
+                Question.text,
+                Question.created_at,
+                Question.updated_at
+            )
+        )
+        question = result.one()
         await db.commit()
-        await db.refresh(question)
         return question
 
     @staticmethod
-    async def get_all(db: AsyncSession) -> List[Question]:
-        """Получить все вопросы"""
+    async def create_many(
+            db: AsyncSession,
+            questions_data: List[QuestionCreate]
+    ) -> List[Row]:
+        """Создать несколько вопросов в одной транзакции.
+
+        Каждая пачка из bulk_chunk_size вопросов вставляется одним
+        многострочным INSERT ... RETURNING.
+
+        Args:
+            db: Сессия базы данных
+            questions_data: Данные вопросов
+
+        Returns:
+            Строки с полями QuestionResponse в порядке входных данных
+        """
+        created = []
+        chunk_size = settings.bulk_chunk_size
+        for start in range(0, len(questions_data), chunk_size):
+            chunk = questions_data[start:start + chunk_size]
+            result = await db.execute(
+                insert(Question)
+                .values([item.model_dump() for item in chunk])
+                .returning(
+                    Question.id,
+                    Question.text,
+                    Question.created_at,
+                    Question.updated_at
+                )
+            )
+            created.extend(result.all())
+        await db.commit()
+        return created
+
+    @staticmethod
+    async def get_page(
+            db: AsyncSession,
+            limit: int,
+            after: Optional[Cursor] = None
+    ) -> List[Row]:
+        """Получить страницу вопросов, начиная после курсора.
+
+        Порядок (created_at desc, id desc) обслуживается индексом
+        ix_questions_created_at_id, поэтому стоимость запроса не зависит
+        от номера страницы. Выбираются только колонки без ORM-объектов.
+
+        Args:
+            db: Сессия базы данных
+            limit: Максимальное количество вопросов
+            after: Позиция последнего вопроса предыдущей страницы
+
+        Returns:
+            Список строк с полями QuestionResponse
+        """
+        query = select(
+            Question.id,
+            Question.text,
+            Question.created_at,
+            Question.updated_at,
+            Question.answer_count
+        ).order_by(
+            Question.created_at.desc(),
+            Question.id.desc()
+        )
+        if after is not None:
+            query = query.where(
+                tuple_(Question.created_at, Question.id) < tuple_(*after)
+            )
+        result = await db.execute(query.limit(limit))
+        return result.all()
+
+    @staticmethod
+    async def get_hot(
+            db: AsyncSession,
+            limit: int
+    ) -> List[Row]:
+        """Получить вопросы с наибольшей недавней активностью ответов.
+
+        Лента читается одним обратным сканированием индекса
+        ix_questions_score. Активность - число ответов, где вклад каждого
+        уменьшается в e раз за HOT_SCORE_DECAY_SECONDS; она вычисляется
+        только для строк результата.
+
+        Args:
+            db: Сессия базы данных
+            limit: Максимальное количество вопросов
+
+        Returns:
+            Список строк с полями HotQuestion
+        """
+        now = func.extract("epoch", func.localtimestamp()) / HOT_SCORE_DECAY_SECONDS
+        # exp в PostgreSQL не округляет очень малые значения до нуля,
+        # а сообщает об ошибке, поэтому показатель ограничен снизу
+        activity = func.exp(func.greatest(Question.score - now, -700))
+
+        result = await db.execute(
+            select(
+                Question.id,
+                Question.text,
+                Question.created_at,
+                Question.updated_at,
+                Question.answer_count,
+                Question.last_answer_at,
+                activity.label("activity")
+            )
+            .where(Question.score.is_not(None))
+            .order_by(Question.score.desc())
+            .limit(limit)
+        )
+        return result.all()
+
+    @staticmethod
+    async def search(
+            db: AsyncSession,
+            text: str,
+            limit: int,
+            offset: int = 0
+    ) -> List[Row]:
+        """Найти вопросы по тексту вопроса и ответов.
+
+        Совпадения ищутся по GIN-индексам search_vector. Вопрос, найденный
+        по ответу, получает половину ранга ответа; из нескольких совпадений
+        берется лучшее. Подсветка строится только для строк страницы.
+
+        Args:
+            db: Сессия базы данных
+            text: Поисковый запрос в синтаксисе websearch_to_tsquery
+            limit: Максимальное количество вопросов
+            offset: Количество пропускаемых вопросов
+
+        Returns:
+            Строки с полями QuestionResponse, rank, highlight
+            и answer_highlight
+        """
+        config = search_config()
+        query = func.websearch_to_tsquery(config, text)
+
+        matches = union_all(
+            select(
+                Question.id.label("question_id"),
+                func.ts_rank(Question.search_vector, query).label("rank")
+            ).where(Question.search_vector.op("@@")(query)),
+            select(
+                Answer.question_id,
+                (func.ts_rank(Answer.search_vector, query) * 0.5).label("rank")
+            ).where(Answer.search_vector.op("@@")(query))
+        ).subquery("matches")
+
+        best = func.max(matches.c.rank).label("rank")
+        ranked = (
+            select(matches.c.question_id, best)
+            .group_by(matches.c.question_id)
+            .order_by(best.desc(), matches.c.question_id.desc())
+            .limit(limit)
+            .offset(offset)
+            .subquery("ranked")
+        )
+
+        answer_highlight = (
+            select(func.ts_headline(config, Answer.text, query, HEADLINE_OPTIONS))
+            .where(
+                Answer.question_id == Question.id,
+                Answer.search_vector.op("@@")(query)
+            )
+            .order_by(func.ts_rank(Answer.search_vector, query).desc())
+            .limit(1)
+            .correlate(Question)
+            .scalar_subquery()
+        )
+
+        result = await db.execute(
+            select(
+                Question.id,
+                Question.text,
+                Question.created_at,
+                Question.updated_at,
+                Question.answer_count,
+                ranked.c.rank,
+                func.ts_headline(config, Question.text, query, HEADLINE_OPTIONS).label("highlight"),
+                answer_highlight.label("answer_highlight")
+            )
+            .join(ranked, ranked.c.question_id == Question.id)
+            .order_by(ranked.c.rank.desc(), Question.id.desc())
+        )
+        return result.all()
+
+    @staticmethod
+    async def count(db: AsyncSession) -> int:
+        """Получить количество вопросов.
+
+        Значение берется из счетчика, который поддерживают триггеры,
+        поэтому таблица вопросов не сканируется.
+        """
         result = await db.execute(
-            select(Question).order_by(Question.created_at.desc())
+            select(func.coalesce(func.sum(stats_counters.c.value), 0))
+            .where(stats_counters.c.name == "questions")
+        )
+        return result.scalar()
+
+    @staticmethod
+    async def stream_all(
+            db: AsyncSession,
+            created_from: Optional[datetime] = None,
+            created_to: Optional[datetime] = None,
+            batch_size: int = settings.export_batch_size
+    ) -> AsyncIterator[List[Row]]:
+        """Потоково прочитать вопросы пачками из серверного курсора.
+
+        В памяти одновременно находится не больше batch_size строк,
+        независимо от размера таблицы.
+
+        Args:
+            db: Сессия базы данных
+            created_from: Нижняя граница created_at (включительно)
+            created_to: Верхняя граница created_at (не включительно)
+            batch_size: Размер пачки
+
+        Yields:
+            Пачки строк с полями QuestionResponse
+        """
+        query = select(
+            Question.id,
+            Question.text,
+            Question.created_at,
+            Question.updated_at,
+            Question.answer_count
+        ).order_by(Question.created_at, Question.id)
+        if created_from is not None:
+            query = query.where(Question.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(Question.created_at < created_to)
+
+        result = await db.stream(
+            query.execution_options(yield_per=batch_size)
         )
-        return result.scalars().all()
+        async for partition in result.partitions():
+            yield partition
 
     @staticmethod
     async def get_by_id(
             db: AsyncSession,
             question_id: int
     ) -> Optional[Question]:
-        """Получить вопрос по ID"""
+        """Получить вопрос по ID без ответов"""
         result = await db.execute(
             select(Question).where(Question.id == question_id)
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_version(
+            db: AsyncSession,
+            question_id: int
+    ) -> Optional[Row]:
+        """Получить версию вопроса вместе с ответами.
+
+        Ответы только добавляются и удаляются, а триггеры активности
+        обновляют answer_count и last_answer_at при каждом изменении,
+        поэтому версии достаточно строки вопроса: одно чтение по
+        первичному ключу, независимо от числа ответов.
+
+        Returns:
+            Строка (updated_at, last_answer_at, answer_count)
+            или None, если вопроса нет
+        """
+        result = await db.execute(
+            select(
+                Question.updated_at,
+                Question.last_answer_at,
+                Question.answer_count
+            )
+            .where(Question.id == question_id)
+        )
+        return result.one_or_none()
+
+    @staticmethod
+    async def exists(
+            db: AsyncSession,
+            question_id: int
+    ) -> bool:
+        """Проверить существование вопроса"""
+        result = await db.execute(
+            select(exists().where(Question.id == question_id))
+        )
+        return result.scalar()
+
+    @staticmethod
+    async def get_summary(
+            db: AsyncSession,
+            question_id: int
+    ) -> Optional[Row]:
+        """Получить вопрос с количеством ответов, без самих ответов.
+
+        Returns:
+            Строка с полями QuestionResponse или None, если вопроса нет
+        """
+        result = await db.execute(
+            select(
+                Question.id,
+                Question.text,
+                Question.created_at,
+                Question.updated_at,
+                Question.answer_count
+            )
+            .where(Question.id == question_id)
+        )
+        return result.one_or_none()
+
     @staticmethod
     async def get_with_answers(
             db: AsyncSession,
             question_id: int
     ) -> Optional[Question]:
-        """Получить вопрос с ответами"""
+        """Получить вопрос со всеми ответами.
+
+        Стоимость растет с числом ответов; для больших вопросов
+        используются get_summary и AnswerCRUD.get_page.
+        """
         result = await db.execute(
             select(Question)
             .options(selectinload(Question.answers))
             .where(Question.id == question_id)
+            .execution_options(populate_existing=True)
         )
         return result.scalar_one_or_none()
 
     @staticmethod
     async def delete(
             db: AsyncSession,
-            question: Question
-    ) -> None:
-        """Удалить вопрос"""
-        await db.delete(question)
+            question_id: int
+    ) -> bool:
+        """Удалить вопрос вместе с ответами одним запросом.
+
+        Ответы удаляет ON DELETE CASCADE внешнего ключа, поэтому число
+        запросов не зависит от количества ответов.
+
+        Returns:
+            True, если вопрос был удален
+        """
+        result = await db.execute(
+            delete(Question)
+            .where(Question.id == question_id)
+            .returning(Question.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.scalar_one_or_none() is not None
         await db.commit()
+        return deleted
 
 
 question_crud = QuestionCRUD()
\ No newline at end of file
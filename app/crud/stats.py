@@ -0,0 +1,48 @@
+"""Чтение счетчиков, поддерживаемых триггерами"""
+
+import math
+from typing import Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import HLL_PRECISION, hll_registers, stats_counters
+
+
+class StatsCRUD:
+    """Операции со статистикой сервиса"""
+
+    @staticmethod
+    async def get_counters(db: AsyncSession) -> Dict[str, int]:
+        """Получить значения всех счетчиков.
+
+        Суммирует шарды счетчиков, поэтому стоимость не зависит от
+        объема данных.
+        """
+        result = await db.execute(
+            select(stats_counters.c.name, func.sum(stats_counters.c.value))
+            .group_by(stats_counters.c.name)
+        )
+        return {name: int(value) for name, value in result.all()}
+
+    @staticmethod
+    async def estimate_unique_users(db: AsyncSession) -> int:
+        """Оценить количество уникальных авторов ответов по HyperLogLog.
+
+        Удаление ответов оценку не уменьшает.
+        """
+        result = await db.execute(select(hll_registers.c.rank))
+        ranks = result.scalars().all()
+
+        m = 1 << HLL_PRECISION
+        zeros = m - len(ranks)
+        harmonic = zeros + sum(2.0 ** -rank for rank in ranks)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / harmonic
+
+        # Поправка для малых мощностей (linear counting)
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+
+stats_crud = StatsCRUD()
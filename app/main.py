@@ -6,16 +6,23 @@ from typing import AsyncIterator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from app.api import health
-from app.api.routers import answers, questions
+from app.api.routers import answers, questions, users
+from app.core.admission import AdmissionControlMiddleware
 from app.core.config import settings
+from app.core.database import async_session_maker, database_features
+from app.core.events import answer_events
 from app.core.exceptions import (
     AppException,
     app_exception_handler,
     general_exception_handler,
+    pool_timeout_exception_handler,
 )
-from app.core.logging import log_request_middleware, setup_logging
+from app.core.logging import AccessLogMiddleware, setup_logging
+from app.core.metrics import PrometheusMiddleware, QueryStatsMiddleware
+from app.crud.answers import answer_batcher
 
 
 @asynccontextmanager
@@ -33,11 +40,26 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info(f"Запуск {settings.app_title} v{settings.app_version}")
     logger.info(f"Документация доступна на /docs")
     logger.info(f"Debug mode: {settings.debug}")
+    if settings.answer_batching_enabled:
+        answer_batcher.start()
+    answer_events.start()
+    try:
+        async with async_session_maker() as db:
+            await database_features.detect(db)
+    except Exception as e:
+        # Проверка повторится при первом запросе, которому нужно расширение
+        logger.warning(f"Failed to detect database extensions: {e}")
 
     yield
 
     # Очистка при остановке
     logger.info("Остановка приложения..")
+    # Дописываем ответы, оставшиеся в очереди
+    await answer_batcher.stop()
+    # Завершаем потоки SSE, иначе сервер будет ждать их закрытия
+    await answer_events.stop()
+    # Дожидаемся записи журнала из очереди
+    await logger.complete()
 
 
 # Создание приложения
@@ -53,6 +75,7 @@ app = FastAPI(
 
 # Обработчики исключений
 app.add_exception_handler(AppException, app_exception_handler)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
 # Настройка CORS (в prod нужно будет изменить подход)
@@ -64,16 +87,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Контроль допуска: при перегрузке запросы отклоняются с 503 до того,
+# как займут соединение с базой данных
+if settings.admission_enabled:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        read_limit=settings.admission_read_limit,
+        write_limit=settings.admission_write_limit,
+        queue_size=settings.admission_queue_size,
+        queue_timeout=settings.admission_queue_timeout_seconds,
+        retry_after=settings.admission_retry_after_seconds,
+        exempt_paths=("/health", "/live", "/ready", "/metrics", "/metrics/prometheus"),
+        # Поток SSE держит соединение часами; его ограничивает
+        # answer_stream_max_subscribers
+        exempt_suffixes=("/answers/stream",),
+        # Выгрузка передается минутами и не должна занимать места лимита
+        # чтения, рассчитанного на короткие запросы
+        path_limits={"/questions/export": settings.export_max_concurrent}
+    )
+
 # Middleware для логирования
-@app.middleware("http")
-async def add_logging_middleware(request, call_next):
-    """Добавить middleware для логирования запросов"""
-    return await log_request_middleware(request, call_next)
+app.add_middleware(AccessLogMiddleware)
+
+# Метрики запросов (внешний слой, чтобы учитывать время всех middleware)
+if settings.metrics_enabled:
+    app.add_middleware(PrometheusMiddleware)
+
+# Статистика SQL запросов; внешний слой, чтобы ее видели все остальные
+app.add_middleware(
+    QueryStatsMiddleware,
+    headers=settings.db_stats_headers,
+    warn_threshold=settings.db_query_warn_threshold
+)
 
 # Подключение роутеров
 app.include_router(health.router)
 app.include_router(questions.router)
 app.include_router(answers.router)
+app.include_router(users.router)
 
 
 @app.get("/", tags=["root"])
@@ -1,22 +1,103 @@
 """Модели для вопросов и ответов"""
 
-from sqlalchemy import ForeignKey, String, Text
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Computed,
+    Double,
+    ForeignKey,
+    Index,
+    SmallInteger,
+    String,
+    Table,
+    Text,
+    event,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.config import settings
 from app.core.database import Base
 
 
+def search_vector_column() -> Mapped[str]:
+    """Колонка полнотекстового поиска по полю text.
+
+    Конфигурация языка фиксируется при создании колонки; после смены
+    search_language колонку нужно пересоздать.
+    """
+    return mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{settings.search_language}'::regconfig, text)", persisted=True),
+        deferred=True
+    )
+
+
+def pg_trgm_available(ddl, target, bind, **kw) -> bool:
+    """Проверить, можно ли создать расширение pg_trgm.
+
+    Без расширения create_all пропускает триграммный индекс, а поиск
+    похожих вопросов недоступен.
+    """
+    if bind is None:
+        return True
+    result = bind.exec_driver_sql(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )
+    return result.scalar() is not None
+
+
+# Время, за которое вклад ответа в score уменьшается в e раз
+HOT_SCORE_DECAY_SECONDS = 86400
+
+
 class Question(Base):
     """Модель вопроса"""
 
+    __table_args__ = (
+        # Индекс для курсорной пагинации списка вопросов
+        Index("ix_questions_created_at_id", "created_at", "id"),
+        # Индекс ленты GET /questions/hot
+        Index("ix_questions_score", "score"),
+        # Индекс полнотекстового поиска
+        Index("ix_questions_search_vector", "search_vector", postgresql_using="gin"),
+        # Триграммный индекс для поиска похожих вопросов
+        Index(
+            "ix_questions_text_trgm",
+            "text",
+            postgresql_using="gin",
+            postgresql_ops={"text": "gin_trgm_ops"}
+        ).ddl_if(callable_=pg_trgm_available),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     text: Mapped[str] = mapped_column(Text, nullable=False)
+    search_vector: Mapped[str] = search_vector_column()
 
-    # Связь с ответами
+    # Активность ответов; поддерживается триггерами answers, поэтому
+    # чтение не агрегирует ответы
+    answer_count: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    last_answer_at: Mapped[Optional[datetime]] = mapped_column(nullable=True)
+    # ln(sum(exp(t / HOT_SCORE_DECAY_SECONDS))) по времени создания ответов
+    # t: порядок по score совпадает с порядком по сумме вкладов ответов,
+    # затухающих со временем, но сам score от текущего времени не зависит
+    # и обновляется только при записи. NULL - ответов нет
+    score: Mapped[Optional[float]] = mapped_column(Double, nullable=True)
+
+    # Связь с ответами. Ответы загружаются только явно (selectinload),
+    # неявная ленивая загрузка запрещена. Удаление ответов выполняет
+    # ON DELETE CASCADE на стороне базы данных. Порядок совпадает с
+    # пагинацией GET /questions/{id}/answers
     answers: Mapped[list["Answer"]] = relationship(
         back_populates="question",
+        order_by="(Answer.created_at, Answer.id)",
         cascade="all, delete-orphan",
-        lazy="selectin"
+        passive_deletes=True,
+        lazy="raise"
     )
 
     def __repr__(self) -> str:
@@ -27,6 +108,23 @@ class Question(Base):
 class Answer(Base):
     """Модель ответа на вопрос"""
 
+    __table_args__ = (
+        # Индекс для выборки, подсчета и курсорной пагинации ответов
+        # на вопрос в порядке (created_at, id)
+        Index("ix_answers_question_id_created_at_id", "question_id", "created_at", "id"),
+        # Индекс истории ответов пользователя; question_id в INCLUDE
+        # позволяет считать отвеченные вопросы без чтения таблицы
+        Index(
+            "ix_answers_user_id_created_at_id",
+            "user_id",
+            "created_at",
+            "id",
+            postgresql_include=["question_id"]
+        ),
+        # Индекс полнотекстового поиска
+        Index("ix_answers_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     question_id: Mapped[int] = mapped_column(
         ForeignKey("questions.id", ondelete="CASCADE"),
@@ -34,13 +132,311 @@ class Answer(Base):
     )
     user_id: Mapped[str] = mapped_column(String(100), nullable=False)
     text: Mapped[str] = mapped_column(Text, nullable=False)
+    search_vector: Mapped[str] = search_vector_column()
 
     # Связь с вопросом
     question: Mapped["Question"] = relationship(
         back_populates="answers",
-        lazy="selectin"
+        lazy="raise"
     )
 
     def __repr__(self) -> str:
         """Строковое представление объекта"""
-        return f"<Answer(id={self.id}, question_id={self.question_id}, user_id={self.user_id})>"
\ No newline at end of file
+        return f"<Answer(id={self.id}, question_id={self.question_id}, user_id={self.user_id})>"
+
+
+# Счетчики строк, которые поддерживаются триггерами. Каждый счетчик
+# разбит на шарды по номеру процесса сервера, чтобы параллельные
+# транзакции не блокировали одну и ту же строку
+stats_counters = Table(
+    "stats_counters",
+    Base.metadata,
+    Column("name", String(50), primary_key=True),
+    Column("shard", SmallInteger, primary_key=True),
+    Column("value", BigInteger, nullable=False, server_default="0"),
+)
+
+# Регистры HyperLogLog для оценки количества уникальных пользователей
+hll_registers = Table(
+    "hll_registers",
+    Base.metadata,
+    Column("idx", SmallInteger, primary_key=True, autoincrement=False),
+    Column("rank", SmallInteger, nullable=False),
+)
+
+STATS_COUNTER_SHARDS = 16
+HLL_PRECISION = 10
+
+# Функции триггеров счетчиков. Триггеры уровня оператора читают
+# переходные таблицы, поэтому массовая вставка обновляет счетчик один раз
+STATS_FUNCTIONS_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION stats_count_inserted() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO stats_counters (name, shard, value)
+        SELECT TG_ARGV[0], mod(pg_backend_pid(), {STATS_COUNTER_SHARDS}), count(*)
+        FROM new_rows
+        HAVING count(*) > 0
+        ON CONFLICT (name, shard)
+        DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION stats_count_deleted() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO stats_counters (name, shard, value)
+        SELECT TG_ARGV[0], mod(pg_backend_pid(), {STATS_COUNTER_SHARDS}), -count(*)
+        FROM old_rows
+        HAVING count(*) > 0
+        ON CONFLICT (name, shard)
+        DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Ранг регистра - позиция первой единицы в старших битах хэша,
+    # номер регистра - младшие HLL_PRECISION бит
+    f"""
+    CREATE OR REPLACE FUNCTION stats_track_users() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO hll_registers (idx, rank)
+        SELECT idx, max(rank)
+        FROM (
+            SELECT
+                substring(h FROM {65 - HLL_PRECISION} FOR {HLL_PRECISION})::bit({HLL_PRECISION})::int AS idx,
+                coalesce(
+                    nullif(position(B'1' IN substring(h FROM 1 FOR {64 - HLL_PRECISION})), 0),
+                    {65 - HLL_PRECISION}
+                ) AS rank
+            FROM (SELECT hashtextextended(user_id, 0)::bit(64) AS h FROM new_rows) AS hashed
+        ) AS registers
+        GROUP BY idx
+        ORDER BY idx
+        ON CONFLICT (idx)
+        DO UPDATE SET rank = EXCLUDED.rank
+        WHERE hll_registers.rank < EXCLUDED.rank;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+
+def stats_triggers_ddl(table: str) -> list[str]:
+    """DDL триггеров, поддерживающих счетчик строк таблицы"""
+    return [
+        f"""
+        CREATE TRIGGER {table}_stats_insert AFTER INSERT ON {table}
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_count_inserted('{table}')
+        """,
+        f"""
+        CREATE TRIGGER {table}_stats_delete AFTER DELETE ON {table}
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_count_deleted('{table}')
+        """,
+    ]
+
+
+ANSWERS_USERS_TRIGGER_DDL = """
+    CREATE TRIGGER answers_stats_users AFTER INSERT ON answers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION stats_track_users()
+"""
+
+# Канал NOTIFY с событиями об ответах для потока /questions/{id}/answers/stream
+ANSWER_EVENTS_CHANNEL = "answer_events"
+
+# Уведомление несет только идентификаторы: полезная нагрузка NOTIFY
+# ограничена 8000 байт, текст ответа подписчики получают отдельным
+# запросом. Ответы, удаленные каскадом вместе с вопросом
+# (pg_trigger_depth() > 1), не уведомляются - их заменяет question_deleted
+ANSWER_EVENTS_FUNCTIONS_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION answer_events_notify() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM pg_notify('{ANSWER_EVENTS_CHANNEL}', json_build_object(
+                'event', 'answer_created', 'id', id, 'question_id', question_id
+            )::text)
+            FROM new_rows;
+        ELSIF pg_trigger_depth() = 1 THEN
+            PERFORM pg_notify('{ANSWER_EVENTS_CHANNEL}', json_build_object(
+                'event', 'answer_deleted', 'id', id, 'question_id', question_id
+            )::text)
+            FROM old_rows;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION question_events_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{ANSWER_EVENTS_CHANNEL}', json_build_object(
+            'event', 'question_deleted', 'id', id, 'question_id', id
+        )::text)
+        FROM old_rows;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+ANSWER_EVENTS_TRIGGERS_DDL = [
+    """
+    CREATE TRIGGER answers_events_insert AFTER INSERT ON answers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION answer_events_notify()
+    """,
+    """
+    CREATE TRIGGER answers_events_delete AFTER DELETE ON answers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION answer_events_notify()
+    """,
+]
+
+# Триггеры активности вопросов. Строки вопросов блокируются в порядке id,
+# чтобы параллельные пачки ответов на несколько вопросов не
+# взаимоблокировались. Сложение score выполняется в логарифмах
+# (logaddexp), поэтому exp не переполняется
+QUESTION_ACTIVITY_FUNCTIONS_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION question_activity_inserted() RETURNS trigger AS $$
+    BEGIN
+        PERFORM 1 FROM questions
+        WHERE id IN (SELECT question_id FROM new_rows)
+        ORDER BY id
+        FOR NO KEY UPDATE;
+
+        UPDATE questions AS q
+        SET answer_count = q.answer_count + a.answers,
+            last_answer_at = greatest(q.last_answer_at, a.last_answer_at),
+            score = CASE
+                WHEN q.score IS NULL THEN a.score
+                ELSE greatest(q.score, a.score) + ln(1 + exp(-abs(q.score - a.score)))
+            END
+        FROM (
+            SELECT question_id,
+                   count(*) AS answers,
+                   max(created_at) AS last_answer_at,
+                   max(m) + ln(sum(exp(x - m))) AS score
+            FROM (
+                SELECT question_id, created_at, x, max(x) OVER (PARTITION BY question_id) AS m
+                FROM (
+                    SELECT question_id, created_at,
+                           extract(epoch FROM created_at)::float8 / {HOT_SCORE_DECAY_SECONDS} AS x
+                    FROM new_rows
+                ) AS points
+            ) AS shifted
+            GROUP BY question_id
+        ) AS a
+        WHERE q.id = a.question_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Удаление пересчитывает активность по оставшимся ответам: вычитание
+    # в логарифмах неустойчиво, а last_answer_at иначе не восстановить.
+    # Пересчет идет по индексу (question_id, created_at, id); ответы,
+    # удаленные каскадом вместе с вопросом, пропускаются
+    f"""
+    CREATE OR REPLACE FUNCTION question_activity_deleted() RETURNS trigger AS $$
+    BEGIN
+        IF pg_trigger_depth() > 1 THEN
+            RETURN NULL;
+        END IF;
+
+        PERFORM 1 FROM questions
+        WHERE id IN (SELECT question_id FROM old_rows)
+        ORDER BY id
+        FOR NO KEY UPDATE;
+
+        UPDATE questions AS q
+        SET answer_count = a.answers,
+            last_answer_at = a.last_answer_at,
+            score = a.score
+        FROM (SELECT DISTINCT question_id FROM old_rows) AS d
+        CROSS JOIN LATERAL (
+            SELECT count(*) AS answers,
+                   max(created_at) AS last_answer_at,
+                   max(m) + ln(sum(exp(x - m))) AS score
+            FROM (
+                SELECT created_at, x, max(x) OVER () AS m
+                FROM (
+                    SELECT created_at,
+                           extract(epoch FROM created_at)::float8 / {HOT_SCORE_DECAY_SECONDS} AS x
+                    FROM answers
+                    WHERE question_id = d.question_id
+                ) AS points
+            ) AS shifted
+        ) AS a
+        WHERE q.id = d.question_id;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+QUESTION_ACTIVITY_TRIGGERS_DDL = [
+    """
+    CREATE TRIGGER answers_activity_insert AFTER INSERT ON answers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION question_activity_inserted()
+    """,
+    """
+    CREATE TRIGGER answers_activity_delete AFTER DELETE ON answers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION question_activity_deleted()
+    """,
+]
+
+QUESTIONS_EVENTS_TRIGGER_DDL = """
+    CREATE TRIGGER questions_events_delete AFTER DELETE ON questions
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION question_events_notify()
+"""
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(callable_=pg_trgm_available)
+)
+for statement in (
+        STATS_FUNCTIONS_DDL
+        + ANSWER_EVENTS_FUNCTIONS_DDL
+        + QUESTION_ACTIVITY_FUNCTIONS_DDL
+):
+    event.listen(Base.metadata, "before_create", DDL(statement))
+for statement in stats_triggers_ddl("questions") + [QUESTIONS_EVENTS_TRIGGER_DDL]:
+    event.listen(Question.__table__, "after_create", DDL(statement))
+for statement in (
+        stats_triggers_ddl("answers")
+        + [ANSWERS_USERS_TRIGGER_DDL]
+        + ANSWER_EVENTS_TRIGGERS_DDL
+        + QUESTION_ACTIVITY_TRIGGERS_DDL
+):
+    event.listen(Answer.__table__, "after_create", DDL(statement))
+event.listen(
+    Base.metadata,
+    "after_drop",
+    DDL(
+        "DROP FUNCTION IF EXISTS stats_count_inserted(), "
+        "stats_count_deleted(), stats_track_users()"
+    )
+)
+event.listen(
+    Base.metadata,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS answer_events_notify(), question_events_notify()")
+)
+event.listen(
+    Base.metadata,
+    "after_drop",
+    DDL(
+        "DROP FUNCTION IF EXISTS question_activity_inserted(), "
+        "question_activity_deleted()"
+    )
+)
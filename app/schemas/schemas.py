@@ -1,7 +1,7 @@
 """Pydantic схемы для валидации данных"""
 
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
@@ -79,10 +79,37 @@ class QuestionResponse(QuestionBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+    answer_count: int = Field(
+        0,
+        ge=0,
+        description="Количество ответов на вопрос"
+    )
     created_at: datetime
     updated_at: datetime
 
 
+class HotQuestion(QuestionResponse):
+    """Вопрос ленты активности"""
+
+    last_answer_at: Optional[datetime] = Field(
+        None,
+        description="Время последнего ответа"
+    )
+    activity: float = Field(
+        ...,
+        ge=0,
+        description="Число ответов, где вклад каждого уменьшается в e раз за сутки"
+    )
+
+
+class SimilarQuestion(BaseModel):
+    """Похожий вопрос"""
+
+    id: int
+    text: str
+    similarity: float = Field(..., ge=0, le=1, description="Триграммное сходство")
+
+
 class QuestionWithAnswers(QuestionResponse):
     """Схема вопроса с ответами"""
 
@@ -90,20 +117,107 @@ class QuestionWithAnswers(QuestionResponse):
         default_factory=list,
         description="Список ответов на вопрос"
     )
+    answers_next_cursor: Optional[str] = Field(
+        None,
+        description=(
+            "Курсор продолжения ответов для GET /questions/{id}/answers, "
+            "None, если приведены все ответы"
+        )
+    )
+
+
+class BulkItemError(BaseModel):
+    """Ошибка валидации элемента массового создания"""
+
+    index: int = Field(..., description="Позиция элемента в запросе")
+    errors: List[str] = Field(..., description="Описание ошибок")
+
+
+class QuestionBulkResponse(BaseModel):
+    """Результат массового создания вопросов"""
+
+    created: List[QuestionResponse]
+    errors: List[BulkItemError]
+
+
+class AnswerBulkResponse(BaseModel):
+    """Результат массового создания ответов"""
+
+    created: List[AnswerResponse]
+    errors: List[BulkItemError]
 
 
 class PaginationParams(BaseModel):
-    """Параметры пагинации"""
+    """Параметры курсорной пагинации"""
 
-    page: int = Field(1, ge=1, description="Номер страницы")
+    cursor: Optional[str] = Field(
+        None,
+        description="Курсор следующей страницы из предыдущего ответа"
+    )
     page_size: int = Field(10, ge=1, le=100, description="Размер страницы")
+    include_total: bool = Field(
+        False,
+        description="Вернуть общее количество записей"
+    )
 
 
 class PaginatedResponse(BaseModel):
     """Ответ с пагинацией"""
 
     items: List[QuestionResponse]
-    total: int
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Курсор следующей страницы, None для последней"
+    )
+    page_size: int
+    total: Optional[int] = Field(
+        None,
+        description="Общее количество записей"
+    )
+
+
+class AnswerPaginatedResponse(BaseModel):
+    """Страница ответов на вопрос"""
+
+    items: List[AnswerResponse]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Курсор следующей страницы, None для последней"
+    )
+    page_size: int
+    total: Optional[int] = Field(
+        None,
+        description="Общее количество ответов на вопрос"
+    )
+
+
+class UserAnswersResponse(AnswerPaginatedResponse):
+    """Страница ответов пользователя"""
+
+    questions_answered: Optional[int] = Field(
+        None,
+        description="Количество вопросов, на которые отвечал пользователь"
+    )
+
+
+class SearchHit(QuestionResponse):
+    """Найденный вопрос"""
+
+    rank: float = Field(..., description="Релевантность")
+    highlight: str = Field(
+        ...,
+        description="Текст вопроса с совпадениями в тегах <mark>"
+    )
+    answer_highlight: Optional[str] = Field(
+        None,
+        description="Фрагмент наиболее релевантного ответа с совпадениями"
+    )
+
+
+class SearchResponse(BaseModel):
+    """Результат полнотекстового поиска"""
+
+    items: List[SearchHit]
     page: int
     page_size: int
-    pages: int
\ No newline at end of file
+    has_more: bool
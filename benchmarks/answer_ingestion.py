@@ -0,0 +1,88 @@
+"""Пропускная способность записи ответов: по одному и пачками.
+
+Создает ответы конкурентными вызовами AnswerCRUD.create, как это делает
+эндпоинт POST /questions/{id}/answers/, сначала с отдельной транзакцией
+на ответ, затем через AnswerBatcher. Выводит ответы и коммиты в секунду.
+
+Использует базу данных из настроек приложения; созданный для прогона
+вопрос удаляется вместе с ответами.
+
+Запуск:
+    python -m benchmarks.answer_ingestion --answers 5000 --concurrency 100
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete, insert
+
+from app.core.database import async_session_maker
+from app.crud import answers
+from app.models.models import Question
+from app.schemas.schemas import AnswerCreate
+
+
+async def create_answers(question_id: int, count: int, concurrency: int) -> float:
+    """Создать ответы и вернуть затраченное время в секундах"""
+    counter = iter(range(count))
+
+    async def worker():
+        for i in counter:
+            async with async_session_maker() as db:
+                answer = await answers.answer_crud.create(
+                    db,
+                    AnswerCreate(user_id=f"user{i % 1000}", text=f"Ответ {i}"),
+                    question_id
+                )
+                assert answer is not None
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def main(count: int, concurrency: int, batch_size: int, delay_ms: float) -> None:
+    """Запустить бенчмарк и вывести результаты"""
+    async with async_session_maker() as db:
+        result = await db.execute(
+            insert(Question).values(text="Вопрос для бенчмарка").returning(Question.id)
+        )
+        question_id = result.scalar()
+        await db.commit()
+
+    try:
+        await create_answers(question_id, min(count, 200), concurrency)
+        single = await create_answers(question_id, count, concurrency)
+
+        answers.answer_batcher = answers.AnswerBatcher(
+            async_session_maker, batch_size, delay_ms / 1000, count
+        )
+        answers.answer_batcher.start()
+        await create_answers(question_id, min(count, 200), concurrency)
+        batches_before = answers.answer_batcher.batches
+        batched = await create_answers(question_id, count, concurrency)
+        batches = answers.answer_batcher.batches - batches_before
+        await answers.answer_batcher.stop()
+    finally:
+        async with async_session_maker() as db:
+            await db.execute(delete(Question).where(Question.id == question_id))
+            await db.commit()
+
+    print(f"answers: {count}, concurrency: {concurrency}, "
+          f"batch: {batch_size} / {delay_ms} ms")
+    print(f"one per transaction: {count / single:9.0f} answers/s  "
+          f"{count / single:9.0f} commits/s")
+    print(f"batched:             {count / batched:9.0f} answers/s  "
+          f"{batches / batched:9.0f} commits/s  "
+          f"({count / batches:.1f} answers/commit, x{single / batched:.1f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--delay-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.answers, args.concurrency, args.batch_size, args.delay_ms))
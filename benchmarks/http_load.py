@@ -0,0 +1,569 @@
+"""Нагрузочный бенчмарк HTTP эндпоинтов сервиса.
+
+Заполняет базу данных набором вопросов и ответов заданного размера и
+прогоняет запросы к эндпоинтам questions, answers и health с заданными
+уровнями конкурентности. Приложение app.main:app вызывается напрямую
+через httpx.ASGITransport и/или через запущенный uvicorn. Для каждого
+эндпоинта выводятся пропускная способность и задержки p50/p95/p99.
+
+Результаты сохраняются в JSON; с --baseline они сравниваются с
+сохраненным прогоном. Процесс завершается с кодом 1 при регрессии и
+при ответах со статусом вне 2xx/3xx, которых сценарий не ожидает:
+замеры эндпоинта, отвечающего ошибками, не имеют смысла.
+
+Бенчмарк использует базу данных из настроек приложения (POSTGRES_*).
+--seed очищает ее таблицы и выполняется только вместе с
+--allow-truncate, поэтому запускать его нужно на отдельной базе.
+
+Не измеряется поток GET /questions/{id}/answers/stream: соединение
+SSE открыто, пока его не закроет клиент, и задержки запроса у него нет.
+
+Запуск:
+    python -m benchmarks.http_load --seed --allow-truncate --questions 10000 --answers 10
+    python -m benchmarks.http_load --mode uvicorn --concurrency 1,16,64
+    python -m benchmarks.http_load --baseline benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import httpx
+from loguru import logger
+from sqlalchemy import func, insert, select, text
+
+from app.core.config import settings
+from app.core.database import Base, async_session_maker, engine
+from app.models.models import Answer, Question
+
+# Словарь для генерации текстов: поиск и поиск похожих должны находить
+# совпадения
+WORDS = (
+    "база данных индекс запрос таблица транзакция кэш сервер клиент "
+    "очередь поток память диск сеть задержка нагрузка ответ вопрос "
+    "пагинация курсор поиск python postgres fastapi asyncio uvicorn"
+).split()
+
+# Один запрос к эндпоинту: принимает клиент и генератор случайных чисел
+RequestFactory = Callable[[httpx.AsyncClient, random.Random], Awaitable[httpx.Response]]
+
+
+@dataclass
+class Dataset:
+    """Идентификаторы данных, к которым обращаются сценарии"""
+
+    question_ids: List[int]
+    answer_ids: List[int]
+    # Ответы и вопросы, удаляемые сценариями DELETE
+    deletable_answer_ids: List[int] = field(default_factory=list)
+    deletable_question_ids: List[int] = field(default_factory=list)
+    # Установлено ли расширение pg_trgm (поиск похожих вопросов)
+    pg_trgm: bool = True
+
+
+@dataclass
+class Scenario:
+    """Запрос к эндпоинту и ожидаемые им статусы ответа"""
+
+    request: RequestFactory
+    # Статусы вне 2xx/3xx, которые не считаются ошибкой
+    expected: FrozenSet[int] = frozenset()
+    # Подготовка данных перед каждым прогоном (количество запросов)
+    prepare: Optional[Callable[[httpx.AsyncClient, int], Awaitable[None]]] = None
+
+
+@dataclass
+class Result:
+    """Результат прогона одного эндпоинта"""
+
+    name: str
+    mode: str
+    concurrency: int
+    requests: int
+    errors: int
+    # Количество неожиданных ответов по статусу ("error" - сбой соединения)
+    unexpected: Dict[str, int]
+    duration_s: float
+    rps: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    """Случайное предложение из словаря"""
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "?"
+
+
+async def seed(questions: int, answers: int, seed_value: int) -> None:
+    """Пересоздать данные бенчмарка.
+
+    Args:
+        questions: Количество вопросов
+        answers: Количество ответов на каждый вопрос
+        seed_value: Зерно генератора текстов
+    """
+    rng = random.Random(seed_value)
+    # Таблицы очищаются, поэтому вызывающий обязан получить явное
+    # согласие (--allow-truncate)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text(
+            "TRUNCATE questions, answers, stats_counters, hll_registers RESTART IDENTITY"
+        ))
+
+    chunk = 5000
+    async with async_session_maker() as db:
+        for start in range(0, questions, chunk):
+            count = min(chunk, questions - start)
+            await db.execute(
+                insert(Question),
+                [{"text": sentence(rng, 8)} for _ in range(count)]
+            )
+        await db.commit()
+
+        rows = [
+            {
+                "question_id": question_id,
+                "user_id": f"user{rng.randrange(1000)}",
+                "text": sentence(rng, 20)
+            }
+            for question_id in range(1, questions + 1)
+            for _ in range(answers)
+        ]
+        for start in range(0, len(rows), chunk):
+            await db.execute(insert(Answer), rows[start:start + chunk])
+        await db.commit()
+
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE questions"))
+        await conn.execute(text("ANALYZE answers"))
+        await conn.commit()
+
+
+async def load_dataset() -> Dataset:
+    """Прочитать идентификаторы существующих данных"""
+    async with async_session_maker() as db:
+        question_ids = (await db.execute(select(Question.id))).scalars().all()
+        answer_ids = (await db.execute(select(Answer.id))).scalars().all()
+        total = (await db.execute(select(func.count()).select_from(Question))).scalar()
+        pg_trgm = (await db.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        )).scalar() is not None
+    if not total:
+        raise SystemExit("База данных пуста, запустите бенчмарк с --seed --allow-truncate")
+    return Dataset(list(question_ids), list(answer_ids), pg_trgm=pg_trgm)
+
+
+def scenarios(dataset: Dataset) -> Dict[str, Scenario]:
+    """Сценарии запросов к эндпоинтам по имени"""
+
+    def question_id(rng: random.Random) -> int:
+        return rng.choice(dataset.question_ids)
+
+    def answers(rng: random.Random, count: int) -> List[dict]:
+        return [
+            {"user_id": f"user{rng.randrange(1000)}", "text": sentence(rng, 20)}
+            for _ in range(count)
+        ]
+
+    async def delete_answer(client, rng):
+        # Удаляемые ответы готовит prepare; если их не хватило, запрос
+        # получает 404, что тоже один DELETE
+        answer_id = dataset.deletable_answer_ids.pop() if dataset.deletable_answer_ids else 0
+        return await client.delete(f"/answers/{answer_id}")
+
+    async def delete_question(client, rng):
+        question = dataset.deletable_question_ids.pop() if dataset.deletable_question_ids else 0
+        return await client.delete(f"/questions/{question}")
+
+    async def prepare_answer_deletes(client: httpx.AsyncClient, count: int) -> None:
+        response = await client.post(
+            f"/questions/{dataset.question_ids[0]}/answers/bulk",
+            json=[{"user_id": "bench", "text": "Ответ для удаления"}] * count
+        )
+        response.raise_for_status()
+        dataset.deletable_answer_ids = [item["id"] for item in response.json()["created"]]
+
+    async def prepare_question_deletes(client: httpx.AsyncClient, count: int) -> None:
+        # Вопросы с ответами, чтобы удаление включало каскад
+        response = await client.post(
+            "/questions/bulk",
+            json=[{"text": "Вопрос для удаления"}] * count
+        )
+        response.raise_for_status()
+        dataset.deletable_question_ids = [item["id"] for item in response.json()["created"]]
+        rng = random.Random(count)
+        for question in dataset.deletable_question_ids:
+            response = await client.post(f"/questions/{question}/answers/bulk", json=answers(rng, 3))
+            response.raise_for_status()
+
+    return {
+        "GET /questions/": Scenario(lambda client, rng: client.get("/questions/")),
+        "GET /questions/?include_total": Scenario(lambda client, rng: client.get(
+            "/questions/", params={"include_total": True, "page_size": 50}
+        )),
+        "GET /questions/{id}": Scenario(lambda client, rng: client.get(
+            f"/questions/{question_id(rng)}"
+        )),
+        "GET /questions/{id}?max_answers": Scenario(lambda client, rng: client.get(
+            f"/questions/{question_id(rng)}", params={"max_answers": 5}
+        )),
+        "GET /questions/{id}/answers": Scenario(lambda client, rng: client.get(
+            f"/questions/{question_id(rng)}/answers", params={"page_size": 20}
+        )),
+        "GET /questions/search": Scenario(lambda client, rng: client.get(
+            "/questions/search", params={"q": " ".join(rng.sample(WORDS, 2))}
+        )),
+        "GET /questions/hot": Scenario(lambda client, rng: client.get("/questions/hot")),
+        "GET /questions/similar": Scenario(lambda client, rng: client.get(
+            "/questions/similar", params={"text": sentence(rng, 8)}
+        )),
+        # Сверх export_max_concurrent выгрузки отклоняются с 503 по замыслу
+        "GET /questions/export": Scenario(
+            lambda client, rng: client.get("/questions/export"),
+            expected=frozenset({503})
+        ),
+        "POST /questions/": Scenario(lambda client, rng: client.post(
+            "/questions/", json={"text": sentence(rng, 8)}
+        )),
+        "POST /questions/bulk": Scenario(lambda client, rng: client.post(
+            "/questions/bulk", json=[{"text": sentence(rng, 8)} for _ in range(10)]
+        )),
+        "DELETE /questions/{id}": Scenario(
+            delete_question,
+            expected=frozenset({404}),
+            prepare=prepare_question_deletes
+        ),
+        "POST /questions/{id}/answers/": Scenario(lambda client, rng: client.post(
+            f"/questions/{question_id(rng)}/answers/", json=answers(rng, 1)[0]
+        )),
+        "POST /questions/{id}/answers/bulk": Scenario(lambda client, rng: client.post(
+            f"/questions/{question_id(rng)}/answers/bulk", json=answers(rng, 10)
+        )),
+        "GET /answers/{id}": Scenario(lambda client, rng: client.get(
+            f"/answers/{rng.choice(dataset.answer_ids)}"
+        )),
+        "DELETE /answers/{id}": Scenario(
+            delete_answer,
+            expected=frozenset({404}),
+            prepare=prepare_answer_deletes
+        ),
+        "GET /users/{id}/answers": Scenario(lambda client, rng: client.get(
+            f"/users/user{rng.randrange(1000)}/answers", params={"page_size": 20}
+        )),
+        "GET /health": Scenario(lambda client, rng: client.get("/health")),
+        "GET /live": Scenario(lambda client, rng: client.get("/live")),
+        "GET /ready": Scenario(lambda client, rng: client.get("/ready")),
+        "GET /metrics": Scenario(lambda client, rng: client.get("/metrics")),
+        "GET /metrics/prometheus": Scenario(lambda client, rng: client.get("/metrics/prometheus")),
+    }
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Перцентиль по методу ближайшего ранга"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def run_endpoint(
+        client: httpx.AsyncClient,
+        name: str,
+        scenario: Scenario,
+        mode: str,
+        concurrency: int,
+        requests: int,
+        seed_value: int
+) -> Result:
+    """Прогнать запросы к одному эндпоинту с заданной конкурентностью"""
+    latencies: List[float] = []
+    unexpected: Dict[str, int] = {}
+    counter = iter(range(requests))
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed_value * 1000 + worker_id)
+        for _ in counter:
+            start = time.perf_counter()
+            try:
+                response = await scenario.request(client, rng)
+                status = response.status_code
+                failed = status >= 400 and status not in scenario.expected
+                outcome = str(status)
+            except httpx.HTTPError:
+                failed = True
+                outcome = "error"
+            latencies.append(time.perf_counter() - start)
+            if failed:
+                unexpected[outcome] = unexpected.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return Result(
+        name=name,
+        mode=mode,
+        concurrency=concurrency,
+        requests=len(latencies),
+        errors=sum(unexpected.values()),
+        unexpected=unexpected,
+        duration_s=round(duration, 4),
+        rps=round(len(latencies) / duration, 1),
+        mean_ms=round(sum(ordered) / len(ordered) * 1000, 3),
+        p50_ms=round(percentile(ordered, 50) * 1000, 3),
+        p95_ms=round(percentile(ordered, 95) * 1000, 3),
+        p99_ms=round(percentile(ordered, 99) * 1000, 3)
+    )
+
+
+async def run_suite(
+        client: httpx.AsyncClient,
+        mode: str,
+        dataset: Dataset,
+        selected: List[str],
+        levels: List[int],
+        requests: int,
+        seed_value: int
+) -> List[Result]:
+    """Прогнать выбранные эндпоинты на всех уровнях конкурентности"""
+    results = []
+    all_scenarios = scenarios(dataset)
+    for name in selected:
+        scenario = all_scenarios[name]
+        for concurrency in levels:
+            # Прогрев соединений, пула и кэшей
+            warmup = min(requests, 50)
+            if scenario.prepare is not None:
+                await scenario.prepare(client, warmup)
+            await run_endpoint(client, name, scenario, mode, concurrency, warmup, seed_value)
+            if scenario.prepare is not None:
+                await scenario.prepare(client, requests)
+            result = await run_endpoint(
+                client, name, scenario, mode, concurrency, requests, seed_value
+            )
+            print_result(result)
+            results.append(result)
+    return results
+
+
+async def run_asgi(dataset: Dataset, args: argparse.Namespace) -> List[Result]:
+    """Прогнать бенчмарк через ASGITransport в этом процессе"""
+    from app.main import app
+
+    # Консольный вывод loguru по умолчанию синхронный и исказил бы замеры
+    logger.remove()
+    # Ошибки приложения считаются как ответы 500, а не прерывают прогон
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await run_suite(
+            client, "asgi", dataset, args.endpoints,
+            args.concurrency, args.requests, args.seed_value
+        )
+
+
+async def run_uvicorn(dataset: Dataset, args: argparse.Namespace) -> List[Result]:
+    """Прогнать бенчмарк через uvicorn, запущенный отдельным процессом"""
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(args.port),
+            "--workers", str(args.workers), "--no-access-log"
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env={**os.environ, "LOG_ACCESS_SAMPLE_RATE": "0"}
+    )
+    base_url = f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            await wait_for_server(client)
+            return await run_suite(
+                client, "uvicorn", dataset, args.endpoints,
+                args.concurrency, args.requests, args.seed_value
+            )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+async def wait_for_server(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    """Дождаться, пока uvicorn начнет отвечать"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/live")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise SystemExit("uvicorn не запустился")
+
+
+def print_result(result: Result) -> None:
+    """Вывести строку результата"""
+    print(
+        f"{result.mode:8} {result.name:34} c={result.concurrency:<4} "
+        f"{result.rps:9.1f} rps  p50 {result.p50_ms:8.2f}  p95 {result.p95_ms:8.2f}  "
+        f"p99 {result.p99_ms:8.2f} ms  errors {result.errors}"
+        + (f" {result.unexpected}" if result.unexpected else "")
+    )
+
+
+def compare(
+        results: List[Result],
+        baseline_path: str,
+        tolerance: float
+) -> List[str]:
+    """Сравнить результаты с сохраненным прогоном.
+
+    Регрессией считается рост p95 или падение пропускной способности
+    больше, чем на tolerance.
+
+    Returns:
+        Описания регрессий
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous: Dict[Tuple[str, str, int], dict] = {
+        (item["mode"], item["name"], item["concurrency"]): item
+        for item in baseline["results"]
+    }
+
+    regressions = []
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%}):")
+    for result in results:
+        old = previous.get((result.mode, result.name, result.concurrency))
+        if old is None:
+            continue
+        p95_change = result.p95_ms / old["p95_ms"] - 1 if old["p95_ms"] else 0.0
+        rps_change = result.rps / old["rps"] - 1 if old["rps"] else 0.0
+        regressed = p95_change > tolerance or rps_change < -tolerance
+        print(
+            f"{result.mode:8} {result.name:34} c={result.concurrency:<4} "
+            f"p95 {p95_change:+7.1%}  rps {rps_change:+7.1%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+        if regressed:
+            regressions.append(f"{result.mode} {result.name} c={result.concurrency}")
+    return regressions
+
+
+def save(results: List[Result], args: argparse.Namespace) -> str:
+    """Сохранить результаты в JSON и вернуть путь к файлу"""
+    output = args.output
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join("benchmarks", "results", f"http_load_{stamp}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "dataset": {
+            "questions": args.questions,
+            "answers_per_question": args.answers,
+            "seed": args.seed_value
+        },
+        "requests": args.requests,
+        "results": [asdict(result) for result in results]
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return output
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Запустить бенчмарк"""
+    if args.seed:
+        if not args.allow_truncate:
+            raise SystemExit(
+                f"--seed очищает таблицы базы {settings.postgres_db!r} "
+                f"на {settings.postgres_host}; добавьте --allow-truncate"
+            )
+        print(f"Seeding {args.questions} questions x {args.answers} answers...")
+        await seed(args.questions, args.answers, args.seed_value)
+    dataset = await load_dataset()
+
+    unknown = set(args.endpoints) - set(scenarios(dataset))
+    if unknown:
+        raise SystemExit(f"Неизвестные эндпоинты: {', '.join(sorted(unknown))}")
+    if not dataset.pg_trgm and "GET /questions/similar" in args.endpoints:
+        print("pg_trgm is not installed, skipping GET /questions/similar")
+        args.endpoints = [name for name in args.endpoints if name != "GET /questions/similar"]
+
+    results = []
+    if args.mode in ("asgi", "both"):
+        results += await run_asgi(dataset, args)
+    if args.mode in ("uvicorn", "both"):
+        results += await run_uvicorn(dataset, args)
+
+    output = save(results, args)
+    print(f"\nResults saved to {output}")
+
+    failed = [result for result in results if result.errors]
+    if failed:
+        print(f"\n{len(failed)} run(s) with unexpected responses, results are not valid:")
+        for result in failed:
+            print(f"  {result.mode} {result.name} c={result.concurrency}: {result.unexpected}")
+        return 1
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {'; '.join(regressions)}")
+            return 1
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разобрать аргументы командной строки"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", action="store_true", help="Пересоздать данные")
+    parser.add_argument(
+        "--allow-truncate",
+        action="store_true",
+        help="Разрешить --seed очистить таблицы базы данных из настроек"
+    )
+    parser.add_argument("--questions", type=int, default=10000)
+    parser.add_argument("--answers", type=int, default=10, help="Ответов на вопрос")
+    parser.add_argument("--seed-value", type=int, default=42)
+    parser.add_argument("--mode", choices=("asgi", "uvicorn", "both"), default="asgi")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 16, 64],
+        help="Уровни конкурентности через запятую"
+    )
+    parser.add_argument("--requests", type=int, default=500, help="Запросов на прогон")
+    parser.add_argument(
+        "--endpoints",
+        type=lambda value: [name.strip() for name in value.split(";")],
+        default=None,
+        help="Эндпоинты через точку с запятой, по умолчанию все"
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", help="Файл результатов JSON")
+    parser.add_argument("--baseline", help="Файл результатов для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args(argv)
+    if args.endpoints is None:
+        args.endpoints = list(scenarios(Dataset([], [])))
+    return args
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,92 @@
+"""Пропускная способность журнала доступа при высокой конкурентности.
+
+Сравнивает прежнюю схему (BaseHTTPMiddleware, две синхронные записи в
+файл на запрос) с AccessLogMiddleware и очередью loguru (enqueue=True).
+
+Запуск:
+    python -m benchmarks.logging_throughput --requests 20000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from loguru import logger
+
+from app.core.logging import AccessLogMiddleware
+
+LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} | {message}"
+
+
+def build_app(pipeline: str) -> FastAPI:
+    """Создать минимальное приложение с выбранной схемой журнала"""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    if pipeline == "legacy":
+        @app.middleware("http")
+        async def log_requests(request, call_next):
+            client_ip = request.client.host if request.client else "unknown"
+            logger.info(f"{request.method} {request.url.path} | Client: {client_ip}")
+            response = await call_next(request)
+            logger.info(
+                f"{request.method} {request.url.path} | "
+                f"Status: {response.status_code}"
+            )
+            return response
+    else:
+        app.add_middleware(AccessLogMiddleware, sample_rate=1.0)
+    return app
+
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> float:
+    """Прогнать запросы и вернуть количество запросов в секунду"""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        counter = iter(range(requests))
+
+        async def worker():
+            for i in counter:
+                await client.get(f"/items/{i}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    await logger.complete()
+    return requests / elapsed
+
+
+async def main(requests: int, concurrency: int) -> None:
+    """Запустить бенчмарк и вывести результаты"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for pipeline, enqueue in (("legacy", False), ("asgi", True)):
+            logger.remove()
+            handler_id = logger.add(
+                os.path.join(directory, f"{pipeline}.log"),
+                format=LOG_FORMAT,
+                level="INFO",
+                enqueue=enqueue
+            )
+            results[pipeline] = await run(build_app(pipeline), requests, concurrency)
+            logger.remove(handler_id)
+
+    print(f"requests: {requests}, concurrency: {concurrency}")
+    print(f"BaseHTTPMiddleware + sync sink: {results['legacy']:8.0f} req/s")
+    print(f"ASGI middleware + enqueue sink: {results['asgi']:8.0f} req/s")
+    print(f"speedup:                        {results['asgi'] / results['legacy']:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,85 @@
+"""Накладные расходы сбора метрик Prometheus.
+
+Сравнивает обработку запросов минимальным приложением с
+PrometheusMiddleware и без него, а также отдельно измеряет стоимость
+записи метрик одного запроса.
+
+Запуск:
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.metrics import (
+    PrometheusMiddleware,
+    http_request_db_seconds,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+    http_response_size_bytes,
+)
+
+
+def build_app(instrumented: bool) -> FastAPI:
+    """Создать минимальное приложение с одним маршрутом"""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    if instrumented:
+        app.add_middleware(PrometheusMiddleware)
+    return app
+
+
+async def measure_requests(app: FastAPI, requests: int) -> float:
+    """Среднее время запроса в микросекундах"""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(200):
+            await client.get(f"/items/{i}")
+        start = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/items/{i}")
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def measure_recording(iterations: int) -> float:
+    """Среднее время записи метрик одного запроса в микросекундах"""
+    route = "/bench/{item_id}"
+    start = time.perf_counter()
+    for _ in range(iterations):
+        http_requests_in_flight.inc("GET")
+        http_requests_in_flight.dec("GET")
+        http_requests_total.inc("GET", route, "200")
+        http_request_duration_seconds.observe(0.003, "GET", route)
+        http_response_size_bytes.observe(512, "GET", route)
+        http_request_db_seconds.observe(0.001, "GET", route)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def main(requests: int) -> None:
+    """Запустить бенчмарк и вывести результаты"""
+    plain = await measure_requests(build_app(False), requests)
+    instrumented = await measure_requests(build_app(True), requests)
+    recording = measure_recording(requests * 10)
+
+    print(f"requests:              {requests}")
+    print(f"without middleware:    {plain:8.1f} us/request")
+    print(f"with middleware:       {instrumented:8.1f} us/request")
+    print(f"overhead:              {instrumented - plain:8.1f} us/request "
+          f"({(instrumented - plain) / plain * 100:.1f}%)")
+    print(f"metrics recording:     {recording:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,118 @@
+"""Стоимость сериализации вопроса с большим списком ответов.
+
+Сравнивает стандартный путь FastAPI (response_model: повторная
+валидация, преобразование в простые типы и json.dumps) с
+FastJSONResponse (TypeAdapter.dump_json без валидации). Измеряется как
+отдельно кодирование, так и полный запрос через ASGI.
+
+Запуск:
+    python -m benchmarks.serialization --answers 500 --requests 2000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core.serialization import FastJSONResponse, dump_json, serializer
+from app.schemas.schemas import QuestionWithAnswers
+
+
+def build_question(answers: int) -> QuestionWithAnswers:
+    """Создать вопрос с заданным количеством ответов"""
+    now = datetime.now(timezone.utc)
+    return QuestionWithAnswers(
+        id=1,
+        text="Как измерить стоимость сериализации ответа?",
+        answer_count=answers,
+        created_at=now,
+        updated_at=now,
+        answers=[
+            {
+                "id": i,
+                "question_id": 1,
+                "user_id": f"user{i % 100}",
+                "text": f"Ответ номер {i}: " + "текст ответа " * 10,
+                "created_at": now,
+                "updated_at": now
+            }
+            for i in range(answers)
+        ]
+    )
+
+
+def build_app(question: QuestionWithAnswers) -> FastAPI:
+    """Создать приложение с обоими вариантами эндпоинта"""
+    app = FastAPI()
+
+    @app.get("/default", response_model=QuestionWithAnswers)
+    async def default_path():
+        return question
+
+    @app.get("/fast", response_model=QuestionWithAnswers)
+    async def fast_path():
+        return FastJSONResponse(question)
+
+    return app
+
+
+def measure_encoding(encode: Callable[[], bytes], iterations: int) -> float:
+    """Среднее время кодирования в микросекундах"""
+    encode()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encode()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def measure_requests(app: FastAPI, path: str, requests: int) -> float:
+    """Среднее время запроса в микросекундах"""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get(path)
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get(path)
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(answers: int, requests: int) -> None:
+    """Запустить бенчмарк и вывести результаты"""
+    question = build_question(answers)
+
+    adapter = serializer(QuestionWithAnswers)
+
+    def default_encode() -> bytes:
+        # То, что делает FastAPI для response_model: валидация,
+        # преобразование в простые типы и json.dumps
+        validated = adapter.validate_python(question.model_dump())
+        return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+    default_encoding = measure_encoding(default_encode, requests)
+    fast_encoding = measure_encoding(lambda: dump_json(question), requests)
+
+    app = build_app(question)
+    default_request = await measure_requests(app, "/default", requests)
+    fast_request = await measure_requests(app, "/fast", requests)
+
+    print(f"answers:               {answers}")
+    print(f"encoding, default:     {default_encoding:10.1f} us")
+    print(f"encoding, fast:        {fast_encoding:10.1f} us "
+          f"(x{default_encoding / fast_encoding:.1f})")
+    print(f"request, default:      {default_request:10.1f} us")
+    print(f"request, fast:         {fast_request:10.1f} us "
+          f"(x{default_request / fast_request:.1f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.answers, args.requests))
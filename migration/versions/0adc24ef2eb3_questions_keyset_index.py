@@ -0,0 +1,33 @@
+"""questions keyset index
+
+Revision ID: 0adc24ef2eb3
+Revises: 93295261689c
+Create Date: 2025-10-01 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0adc24ef2eb3'
+down_revision: Union[str, Sequence[str], None] = '93295261689c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_questions_created_at_id',
+        'questions',
+        ['created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_questions_created_at_id', table_name='questions')
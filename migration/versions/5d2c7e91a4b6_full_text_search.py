@@ -0,0 +1,68 @@
+"""full text search
+
+Revision ID: 5d2c7e91a4b6
+Revises: 8f335e0ff4d4
+Create Date: 2025-10-08 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2c7e91a4b6'
+down_revision: Union[str, Sequence[str], None] = '8f335e0ff4d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Язык берется из настроек, как и в запросах приложения: колонка,
+# построенная с другой конфигурацией, не совпала бы с to_tsquery
+SEARCH_VECTOR = f"to_tsvector('{settings.search_language}'::regconfig, text)"
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Вход в autocommit_block фиксирует все предыдущие команды, поэтому
+    колонки и индексы создаются внутри него и идемпотентно: после сбоя
+    миграцию можно запустить повторно.
+    """
+    bind = op.get_bind()
+    with op.get_context().autocommit_block():
+        for table in ('questions', 'answers'):
+            op.execute(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED"
+            )
+
+        # GIN-индексы строятся без блокировки записи. Прерванное
+        # построение оставляет невалидный индекс, его строим заново
+        for table in ('questions', 'answers'):
+            index = f'ix_{table}_search_vector'
+            invalid = bind.exec_driver_sql(
+                f"SELECT 1 FROM pg_index "
+                f"WHERE indexrelid = to_regclass('{index}') AND NOT indisvalid"
+            ).scalar()
+            if invalid:
+                op.drop_index(index, table_name=table, postgresql_concurrently=True)
+            op.create_index(
+                index,
+                table,
+                ['search_vector'],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('questions', 'answers'):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
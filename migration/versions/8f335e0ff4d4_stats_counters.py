@@ -0,0 +1,162 @@
+"""stats counters
+
+Revision ID: 8f335e0ff4d4
+Revises: b33729188f83
+Create Date: 2025-10-06 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f335e0ff4d4'
+down_revision: Union[str, Sequence[str], None] = 'b33729188f83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FUNCTIONS = [
+    """
+        CREATE OR REPLACE FUNCTION stats_count_inserted() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO stats_counters (name, shard, value)
+            SELECT TG_ARGV[0], mod(pg_backend_pid(), 16), count(*)
+            FROM new_rows
+            HAVING count(*) > 0
+            ON CONFLICT (name, shard)
+            DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """,
+    """
+        CREATE OR REPLACE FUNCTION stats_count_deleted() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO stats_counters (name, shard, value)
+            SELECT TG_ARGV[0], mod(pg_backend_pid(), 16), -count(*)
+            FROM old_rows
+            HAVING count(*) > 0
+            ON CONFLICT (name, shard)
+            DO UPDATE SET value = stats_counters.value + EXCLUDED.value;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """,
+    """
+        CREATE OR REPLACE FUNCTION stats_track_users() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO hll_registers (idx, rank)
+            SELECT idx, max(rank)
+            FROM (
+                SELECT
+                    substring(h FROM 55 FOR 10)::bit(10)::int AS idx,
+                    coalesce(
+                        nullif(position(B'1' IN substring(h FROM 1 FOR 54)), 0),
+                        55
+                    ) AS rank
+                FROM (SELECT hashtextextended(user_id, 0)::bit(64) AS h FROM new_rows) AS hashed
+            ) AS registers
+            GROUP BY idx
+            ORDER BY idx
+            ON CONFLICT (idx)
+            DO UPDATE SET rank = EXCLUDED.rank
+            WHERE hll_registers.rank < EXCLUDED.rank;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+]
+
+TRIGGERS = [
+    """
+        CREATE TRIGGER questions_stats_insert AFTER INSERT ON questions
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_count_inserted('questions')
+    """,
+    """
+        CREATE TRIGGER questions_stats_delete AFTER DELETE ON questions
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_count_deleted('questions')
+    """,
+    """
+        CREATE TRIGGER answers_stats_insert AFTER INSERT ON answers
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_count_inserted('answers')
+    """,
+    """
+        CREATE TRIGGER answers_stats_delete AFTER DELETE ON answers
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_count_deleted('answers')
+    """,
+    """
+        CREATE TRIGGER answers_stats_users AFTER INSERT ON answers
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION stats_track_users()
+    """
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stats_counters',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('shard', sa.SmallInteger(), nullable=False),
+        sa.Column('value', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('name', 'shard')
+    )
+    op.create_table(
+        'hll_registers',
+        sa.Column('idx', sa.SmallInteger(), autoincrement=False, nullable=False),
+        sa.Column('rank', sa.SmallInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('idx')
+    )
+    for statement in FUNCTIONS:
+        op.execute(statement)
+
+    # Заполняем счетчики по существующим данным до создания триггеров.
+    # Запись блокируется до конца транзакции миграции, иначе изменения
+    # между заполнением и созданием триггеров не учел бы никто
+    op.execute("LOCK TABLE questions, answers IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        "INSERT INTO stats_counters (name, shard, value) "
+        "SELECT 'questions', 0, count(*) FROM questions"
+    )
+    op.execute(
+        "INSERT INTO stats_counters (name, shard, value) "
+        "SELECT 'answers', 0, count(*) FROM answers"
+    )
+    op.execute(
+        """
+        INSERT INTO hll_registers (idx, rank)
+        SELECT idx, max(rank)
+        FROM (
+            SELECT
+                substring(h FROM 55 FOR 10)::bit(10)::int AS idx,
+                coalesce(nullif(position(B'1' IN substring(h FROM 1 FOR 54)), 0), 55) AS rank
+            FROM (SELECT hashtextextended(user_id, 0)::bit(64) AS h FROM answers) AS hashed
+        ) AS registers
+        GROUP BY idx
+        """
+    )
+
+    for statement in TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS answers_stats_users ON answers")
+    op.execute("DROP TRIGGER IF EXISTS answers_stats_delete ON answers")
+    op.execute("DROP TRIGGER IF EXISTS answers_stats_insert ON answers")
+    op.execute("DROP TRIGGER IF EXISTS questions_stats_delete ON questions")
+    op.execute("DROP TRIGGER IF EXISTS questions_stats_insert ON questions")
+    op.execute(
+        "DROP FUNCTION IF EXISTS stats_count_inserted(), "
+        "stats_count_deleted(), stats_track_users()"
+    )
+    op.drop_table('hll_registers')
+    op.drop_table('stats_counters')
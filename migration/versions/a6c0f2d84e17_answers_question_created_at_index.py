@@ -0,0 +1,54 @@
+"""answers question_id, created_at, id index
+
+Revision ID: a6c0f2d84e17
+Revises: e7a19d3c5f20
+Create Date: 2025-10-11 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c0f2d84e17'
+down_revision: Union[str, Sequence[str], None] = 'e7a19d3c5f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Составной индекс заменяет ix_answers_question_id: по его первой
+    # колонке по-прежнему работают каскадное удаление и подсчет ответов
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_answers_question_id_created_at_id',
+            'answers',
+            ['question_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_answers_question_id',
+            table_name='answers',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_answers_question_id',
+            'answers',
+            ['question_id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_answers_question_id_created_at_id',
+            table_name='answers',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,33 @@
+"""answers question_id index
+
+Revision ID: b33729188f83
+Revises: 0adc24ef2eb3
+Create Date: 2025-10-02 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b33729188f83'
+down_revision: Union[str, Sequence[str], None] = '0adc24ef2eb3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_answers_question_id',
+        'answers',
+        ['question_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_answers_question_id', table_name='answers')
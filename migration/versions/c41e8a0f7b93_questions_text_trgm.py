@@ -0,0 +1,52 @@
+"""questions text trigram index
+
+Revision ID: c41e8a0f7b93
+Revises: 5d2c7e91a4b6
+Create Date: 2025-10-09 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e8a0f7b93'
+down_revision: Union[str, Sequence[str], None] = '5d2c7e91a4b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def pg_trgm_available() -> bool:
+    """Можно ли создать расширение pg_trgm (как models.pg_trgm_available)"""
+    result = op.get_bind().exec_driver_sql(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )
+    return result.scalar() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Без расширения индекс не создается, а поиск похожих вопросов
+    # отключается приложением, как и при create_all
+    if not pg_trgm_available():
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_text_trgm',
+            'questions',
+            ['text'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'text': 'gin_trgm_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_questions_text_trgm', table_name='questions', if_exists=True)
@@ -0,0 +1,176 @@
+"""questions answer activity columns
+
+Revision ID: d2f4b7a913c6
+Revises: a6c0f2d84e17
+Create Date: 2025-10-12 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f4b7a913c6'
+down_revision: Union[str, Sequence[str], None] = 'a6c0f2d84e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Вклад ответа в score уменьшается в e раз за сутки
+# (HOT_SCORE_DECAY_SECONDS в app.models.models)
+FUNCTIONS = [
+    """
+        CREATE OR REPLACE FUNCTION question_activity_inserted() RETURNS trigger AS $$
+        BEGIN
+            PERFORM 1 FROM questions
+            WHERE id IN (SELECT question_id FROM new_rows)
+            ORDER BY id
+            FOR NO KEY UPDATE;
+
+            UPDATE questions AS q
+            SET answer_count = q.answer_count + a.answers,
+                last_answer_at = greatest(q.last_answer_at, a.last_answer_at),
+                score = CASE
+                    WHEN q.score IS NULL THEN a.score
+                    ELSE greatest(q.score, a.score) + ln(1 + exp(-abs(q.score - a.score)))
+                END
+            FROM (
+                SELECT question_id,
+                       count(*) AS answers,
+                       max(created_at) AS last_answer_at,
+                       max(m) + ln(sum(exp(x - m))) AS score
+                FROM (
+                    SELECT question_id, created_at, x, max(x) OVER (PARTITION BY question_id) AS m
+                    FROM (
+                        SELECT question_id, created_at,
+                               extract(epoch FROM created_at)::float8 / 86400 AS x
+                        FROM new_rows
+                    ) AS points
+                ) AS shifted
+                GROUP BY question_id
+            ) AS a
+            WHERE q.id = a.question_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """,
+    """
+        CREATE OR REPLACE FUNCTION question_activity_deleted() RETURNS trigger AS $$
+        BEGIN
+            IF pg_trigger_depth() > 1 THEN
+                RETURN NULL;
+            END IF;
+
+            PERFORM 1 FROM questions
+            WHERE id IN (SELECT question_id FROM old_rows)
+            ORDER BY id
+            FOR NO KEY UPDATE;
+
+            UPDATE questions AS q
+            SET answer_count = a.answers,
+                last_answer_at = a.last_answer_at,
+                score = a.score
+            FROM (SELECT DISTINCT question_id FROM old_rows) AS d
+            CROSS JOIN LATERAL (
+                SELECT count(*) AS answers,
+                       max(created_at) AS last_answer_at,
+                       max(m) + ln(sum(exp(x - m))) AS score
+                FROM (
+                    SELECT created_at, x, max(x) OVER () AS m
+                    FROM (
+                        SELECT created_at,
+                               extract(epoch FROM created_at)::float8 / 86400 AS x
+                        FROM answers
+                        WHERE question_id = d.question_id
+                    ) AS points
+                ) AS shifted
+            ) AS a
+            WHERE q.id = d.question_id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+]
+
+TRIGGERS = [
+    """
+        CREATE TRIGGER answers_activity_insert AFTER INSERT ON answers
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION question_activity_inserted()
+    """,
+    """
+        CREATE TRIGGER answers_activity_delete AFTER DELETE ON answers
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION question_activity_deleted()
+    """
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Запись блокируется до коммита, который выполняет autocommit_block:
+    # ответы, записанные между заполнением и созданием триггеров, иначе
+    # не попали бы в активность вопросов
+    op.execute("LOCK TABLE questions, answers IN SHARE ROW EXCLUSIVE MODE")
+    op.add_column(
+        'questions',
+        sa.Column('answer_count', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.add_column('questions', sa.Column('last_answer_at', sa.DateTime(), nullable=True))
+    op.add_column('questions', sa.Column('score', sa.Double(), nullable=True))
+    for statement in FUNCTIONS:
+        op.execute(statement)
+
+    # Заполняем активность по существующим ответам до создания триггеров
+    op.execute(
+        """
+        UPDATE questions AS q
+        SET answer_count = a.answers,
+            last_answer_at = a.last_answer_at,
+            score = a.score
+        FROM (
+            SELECT question_id,
+                   count(*) AS answers,
+                   max(created_at) AS last_answer_at,
+                   max(m) + ln(sum(exp(x - m))) AS score
+            FROM (
+                SELECT question_id, created_at, x, max(x) OVER (PARTITION BY question_id) AS m
+                FROM (
+                    SELECT question_id, created_at,
+                           extract(epoch FROM created_at)::float8 / 86400 AS x
+                    FROM answers
+                ) AS points
+            ) AS shifted
+            GROUP BY question_id
+        ) AS a
+        WHERE q.id = a.question_id
+        """
+    )
+
+    for statement in TRIGGERS:
+        op.execute(statement)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_questions_score',
+            'questions',
+            ['score'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_questions_score', table_name='questions')
+    op.execute("DROP TRIGGER IF EXISTS answers_activity_delete ON answers")
+    op.execute("DROP TRIGGER IF EXISTS answers_activity_insert ON answers")
+    op.execute(
+        "DROP FUNCTION IF EXISTS question_activity_inserted(), "
+        "question_activity_deleted()"
+    )
+    op.drop_column('questions', 'score')
+    op.drop_column('questions', 'last_answer_at')
+    op.drop_column('questions', 'answer_count')
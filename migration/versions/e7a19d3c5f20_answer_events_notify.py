@@ -0,0 +1,83 @@
+"""answer events notify triggers
+
+Revision ID: e7a19d3c5f20
+Revises: c41e8a0f7b93
+Create Date: 2025-10-10 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a19d3c5f20'
+down_revision: Union[str, Sequence[str], None] = 'c41e8a0f7b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FUNCTIONS = [
+    """
+        CREATE OR REPLACE FUNCTION answer_events_notify() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM pg_notify('answer_events', json_build_object(
+                    'event', 'answer_created', 'id', id, 'question_id', question_id
+                )::text)
+                FROM new_rows;
+            ELSIF pg_trigger_depth() = 1 THEN
+                PERFORM pg_notify('answer_events', json_build_object(
+                    'event', 'answer_deleted', 'id', id, 'question_id', question_id
+                )::text)
+                FROM old_rows;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """,
+    """
+        CREATE OR REPLACE FUNCTION question_events_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('answer_events', json_build_object(
+                'event', 'question_deleted', 'id', id, 'question_id', id
+            )::text)
+            FROM old_rows;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """
+]
+
+TRIGGERS = [
+    """
+        CREATE TRIGGER answers_events_insert AFTER INSERT ON answers
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION answer_events_notify()
+    """,
+    """
+        CREATE TRIGGER answers_events_delete AFTER DELETE ON answers
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION answer_events_notify()
+    """,
+    """
+        CREATE TRIGGER questions_events_delete AFTER DELETE ON questions
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION question_events_notify()
+    """
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in FUNCTIONS + TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS questions_events_delete ON questions")
+    op.execute("DROP TRIGGER IF EXISTS answers_events_delete ON answers")
+    op.execute("DROP TRIGGER IF EXISTS answers_events_insert ON answers")
+    op.execute("DROP FUNCTION IF EXISTS answer_events_notify(), question_events_notify()")
@@ -0,0 +1,36 @@
+"""answers user_id, created_at, id index
+
+Revision ID: f81c3e6a25d9
+Revises: d2f4b7a913c6
+Create Date: 2025-10-13 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f81c3e6a25d9'
+down_revision: Union[str, Sequence[str], None] = 'd2f4b7a913c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_answers_user_id_created_at_id',
+            'answers',
+            ['user_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_include=['question_id'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_answers_user_id_created_at_id', table_name='answers')
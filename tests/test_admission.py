@@ -0,0 +1,124 @@
+"""Тесты для контроля допуска и ограничения частоты."""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.admission import AdmissionControlMiddleware, TokenBucketLimiter
+
+
+def build_app(release: asyncio.Event, queue_timeout: float = 5.0) -> FastAPI:
+    """Приложение с медленным эндпоинтом и лимитом в один запрос"""
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"status": "ok"}
+
+    @app.get("/export")
+    async def export():
+        await release.wait()
+        return {"status": "ok"}
+
+    @app.get("/fast")
+    async def fast():
+        return {"status": "ok"}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        read_limit=1,
+        write_limit=1,
+        queue_size=1,
+        queue_timeout=queue_timeout,
+        retry_after=3,
+        exempt_paths=("/health",),
+        path_limits={"/export": 1}
+    )
+    return app
+
+
+@pytest.mark.asyncio
+async def test_admission_sheds_when_queue_full():
+    """Тест: при заполненной очереди запрос сразу получает 503"""
+    release = asyncio.Event()
+    transport = ASGITransport(app=build_app(release))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        running = asyncio.create_task(client.get("/slow"))
+        queued = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.05)
+
+        response = await client.get("/slow")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert response.json()["status_code"] == 503
+
+        # Служебные пути не ограничиваются
+        assert (await client.get("/health")).status_code == 200
+
+        release.set()
+        assert (await running).status_code == 200
+        assert (await queued).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_admission_queue_timeout():
+    """Тест: запрос, слишком долго ждущий в очереди, получает 503"""
+    release = asyncio.Event()
+    transport = ASGITransport(app=build_app(release, queue_timeout=0.05))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        running = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.01)
+
+        response = await client.get("/slow")
+        assert response.status_code == 503
+
+        release.set()
+        assert (await running).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_admission_path_limit():
+    """Тест: путь с собственным лимитом не занимает мест лимита чтения"""
+    release = asyncio.Event()
+    transport = ASGITransport(app=build_app(release))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        export = asyncio.create_task(client.get("/export"))
+        await asyncio.sleep(0.05)
+
+        # Лимит чтения свободен, пока идет выгрузка
+        response = await asyncio.wait_for(client.get("/fast"), 1)
+        assert response.status_code == 200
+
+        # Сверх собственного лимита запрос отклоняется без очереди
+        response = await client.get("/export")
+        assert response.status_code == 503
+
+        release.set()
+        assert (await export).status_code == 200
+
+
+def test_token_bucket():
+    """Тест пополнения корзины и изоляции ключей"""
+    now = [0.0]
+    limiter = TokenBucketLimiter(rate=2.0, burst=2, max_keys=2, clock=lambda: now[0])
+
+    assert limiter.acquire("user1") is None
+    assert limiter.acquire("user1") is None
+    assert limiter.acquire("user1") == pytest.approx(0.5)
+    assert limiter.acquire("user2") is None
+
+    now[0] = 0.5
+    assert limiter.acquire("user1") is None
+    assert limiter.acquire("user1") is not None
+
+    # Давно не использовавшийся ключ вытесняется
+    limiter.acquire("user3")
+    assert "user2" not in limiter._buckets
+    assert "user1" in limiter._buckets
@@ -1,5 +1,8 @@
 """Тесты для API эндпоинтов."""
 
+import json
+from datetime import datetime, timezone
+
 import pytest
 from httpx import AsyncClient
 
@@ -28,10 +31,60 @@ async def test_get_all_questions(client: AsyncClient):
     response = await client.get("/questions/")
     assert response.status_code == 200
     data = response.json()
-    assert len(data) == 2
+    assert len(data["items"]) == 2
+    assert data["next_cursor"] is None
 
 
 @pytest.mark.asyncio
+async def test_get_questions_cursor_pagination(client: AsyncClient):
+    """Тест курсорной пагинации списка вопросов"""
+    for i in range(5):
+        await client.post("/questions/", json={"text": f"Вопрос {i}"})
+
+    response = await client.get(
+        "/questions/",
+        params={"page_size": 2, "include_total": True}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [q["text"] for q in data["items"]] == ["Вопрос 4", "Вопрос 3"]
+    assert data["total"] == 5
+
+    seen = [q["id"] for q in data["items"]]
+    while data["next_cursor"]:
+        response = await client.get(
+            "/questions/",
+            params={"page_size": 2, "cursor": data["next_cursor"]}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        seen.extend(q["id"] for q in data["items"])
+
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_get_questions_invalid_cursor(client: AsyncClient):
+    """Тест передачи поврежденного курсора"""
+    response = await client.get("/questions/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 422
+
+    # Подделанные курсоры, которые не сравнить с колонками
+    from app.core.pagination import encode_cursor
+
+    for cursor in (
+        encode_cursor(datetime(2025, 1, 1, tzinfo=timezone.utc), 1),
+        encode_cursor(datetime(2025, 1, 1), 2 ** 31),
+        encode_cursor(datetime(2025, 1, 1), 0),
+    ):
+        response = await client.get("/questions/", params={"cursor": cursor})
+        assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(2)
 async def test_get_question_with_answers(client: AsyncClient):
     """Тест получения вопроса с ответами"""
     # Создаем вопрос
@@ -57,6 +110,176 @@ async def test_get_question_with_answers(client: AsyncClient):
     data = response.json()
     assert data["text"] == "Тестовый вопрос"
     assert len(data["answers"]) == 2
+    assert data["answer_count"] == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(2)
+async def test_get_all_questions_answer_count(client: AsyncClient):
+    """Тест количества ответов в списке вопросов"""
+    question_response = await client.post(
+        "/questions/",
+        json={"text": "Вопрос с ответами"}
+    )
+    assert question_response.json()["answer_count"] == 0
+    question_id = question_response.json()["id"]
+    await client.post("/questions/", json={"text": "Вопрос без ответов"})
+
+    for i in range(3):
+        await client.post(
+            f"/questions/{question_id}/answers/",
+            json={"user_id": f"user{i}", "text": f"Ответ {i}"}
+        )
+
+    response = await client.get("/questions/")
+    assert response.status_code == 200
+    counts = {q["id"]: q["answer_count"] for q in response.json()["items"]}
+    assert counts[question_id] == 3
+    assert sorted(counts.values()) == [0, 3]
+
+
+@pytest.mark.asyncio
+async def test_export_questions(client: AsyncClient):
+    """Тест потоковой выгрузки вопросов в NDJSON"""
+    first = (await client.post("/questions/", json={"text": "Первый"})).json()
+    second = (await client.post("/questions/", json={"text": "Второй"})).json()
+    await client.post(
+        f"/questions/{first['id']}/answers/",
+        json={"user_id": "user1", "text": "Ответ"}
+    )
+
+    response = await client.get("/questions/export", params={"include_answers": True})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [q["id"] for q in lines] == [first["id"], second["id"]]
+    assert [a["text"] for a in lines[0]["answers"]] == ["Ответ"]
+    assert lines[0]["answer_count"] == 1
+    assert lines[1]["answers"] == []
+
+    response = await client.get(
+        "/questions/export",
+        params={"created_from": second["created_at"]}
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [q["id"] for q in lines] == [second["id"]]
+    assert "answers" not in lines[0]
+
+
+@pytest.mark.asyncio
+async def test_question_cache_invalidation(client: AsyncClient):
+    """Тест инвалидации кэша вопроса при изменении ответов"""
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+
+    response = await client.get(f"/questions/{question_id}")
+    assert response.json()["answers"] == []
+
+    answer_response = await client.post(
+        f"/questions/{question_id}/answers/",
+        json={"user_id": "user1", "text": "Ответ"}
+    )
+    response = await client.get(f"/questions/{question_id}")
+    assert len(response.json()["answers"]) == 1
+
+    await client.delete(f"/answers/{answer_response.json()['id']}")
+    response = await client.get(f"/questions/{question_id}")
+    assert response.json()["answers"] == []
+
+    await client.delete(f"/questions/{question_id}")
+    response = await client.get(f"/questions/{question_id}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_question_etag(client: AsyncClient, query_budget):
+    """Тест условного запроса вопроса по ETag"""
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+
+    response = await client.get(f"/questions/{question_id}")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    response = await client.get(
+        f"/questions/{question_id}",
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+    await client.post(
+        f"/questions/{question_id}/answers/",
+        json={"user_id": "user1", "text": "Ответ"}
+    )
+    response = await client.get(
+        f"/questions/{question_id}",
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    # ETag из строки вопроса совпадает с ETag, вычисленным по загруженному
+    # вопросу, и проверяется одним запросом без чтения ответов
+    with query_budget(1):
+        response = await client.get(
+            f"/questions/{question_id}",
+            headers={"If-None-Match": response.headers["etag"]}
+        )
+    assert response.status_code == 304
+
+    answer_id = (await client.get(f"/questions/{question_id}")).json()["answers"][0]["id"]
+    await client.delete(f"/answers/{answer_id}")
+    response = await client.get(
+        f"/questions/{question_id}",
+        headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["answers"] == []
+
+
+@pytest.mark.asyncio
+async def test_questions_list_etag(client: AsyncClient):
+    """Тест условного запроса списка вопросов по ETag"""
+    await client.post("/questions/", json={"text": "Вопрос 1"})
+
+    response = await client.get("/questions/")
+    etag = response.headers["etag"]
+
+    response = await client.get("/questions/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.post("/questions/", json={"text": "Вопрос 2"})
+    response = await client.get("/questions/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_counters(client: AsyncClient):
+    """Тест счетчиков метрик, поддерживаемых триггерами"""
+    first = (await client.post("/questions/", json={"text": "Вопрос 1"})).json()
+    second = (await client.post("/questions/", json={"text": "Вопрос 2"})).json()
+    await client.post(
+        f"/questions/{first['id']}/answers/bulk",
+        json=[{"user_id": f"user{i % 3}", "text": "Ответ"} for i in range(6)]
+    )
+    await client.post(
+        f"/questions/{second['id']}/answers/",
+        json={"user_id": "user0", "text": "Ответ"}
+    )
+
+    response = await client.get("/metrics")
+    data = response.json()
+    assert data["questions_total"] == 2
+    assert data["answers_total"] == 7
+    assert data["unique_users"] == 3
+    assert data["avg_answers_per_question"] == 3.5
+
+    await client.delete(f"/questions/{first['id']}")
+    data = (await client.get("/metrics")).json()
+    assert data["questions_total"] == 1
+    assert data["answers_total"] == 1
 
 
 @pytest.mark.asyncio
@@ -140,4 +363,531 @@ async def test_validation_empty_text(client: AsyncClient):
         f"/questions/{question_id}/answers/",
         json={"user_id": "user1", "text": "   "}
     )
-    assert response.status_code == 422
\ No newline at end of file
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_create_questions_bulk(client: AsyncClient):
+    """Тест массового создания вопросов с поэлементными ошибками"""
+    response = await client.post(
+        "/questions/bulk",
+        json=[{"text": "Вопрос 1"}, {"text": ""}, {"text": "Вопрос 3"}, "мусор"]
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert [q["text"] for q in data["created"]] == ["Вопрос 1", "Вопрос 3"]
+    assert [e["index"] for e in data["errors"]] == [1, 3]
+
+    response = await client.get("/questions/", params={"include_total": True})
+    assert response.json()["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_create_answers_bulk(client: AsyncClient):
+    """Тест массового создания ответов"""
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+
+    items = [{"user_id": f"user{i}", "text": f"Ответ {i}"} for i in range(1500)]
+    items.append({"user_id": "user"})
+    response = await client.post(f"/questions/{question_id}/answers/bulk", json=items)
+    assert response.status_code == 201
+    data = response.json()
+    assert len(data["created"]) == 1500
+    assert data["created"][0]["question_id"] == question_id
+    assert data["errors"][0]["index"] == 1500
+
+    response = await client.get(f"/questions/{question_id}")
+    assert response.json()["answer_count"] == 1500
+
+    response = await client.post("/questions/999/answers/bulk", json=items)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_search_questions(client: AsyncClient):
+    """Тест полнотекстового поиска по вопросам и ответам"""
+    by_question = await client.post("/questions/", json={"text": "Как настроить базы данных?"})
+    by_answer = await client.post("/questions/", json={"text": "Что выбрать для хранения?"})
+    await client.post("/questions/", json={"text": "Как приготовить кофе?"})
+    await client.post(
+        f"/questions/{by_answer.json()['id']}/answers/",
+        json={"user_id": "user1", "text": "Возьмите реляционную базу данных"}
+    )
+
+    response = await client.get("/questions/search", params={"q": "база данных"})
+    assert response.status_code == 200
+    data = response.json()
+    assert [q["id"] for q in data["items"]] == [by_question.json()["id"], by_answer.json()["id"]]
+    assert "<mark>" in data["items"][0]["highlight"]
+    assert data["items"][0]["answer_highlight"] is None
+    assert "<mark>" in data["items"][1]["answer_highlight"]
+    assert data["has_more"] is False
+
+    response = await client.get("/questions/search", params={"q": "база", "page_size": 1})
+    assert response.json()["has_more"] is True
+
+    response = await client.get("/questions/search", params={"q": "самолет"})
+    assert response.json()["items"] == []
+
+
+@pytest.mark.asyncio
+async def test_similar_questions(client: AsyncClient, pg_trgm):
+    """Тест поиска похожих вопросов"""
+    original = await client.post("/questions/", json={"text": "Как установить Python на Windows?"})
+    await client.post("/questions/", json={"text": "Как приготовить кофе?"})
+
+    response = await client.get(
+        "/questions/similar",
+        params={"text": "Как установить Python в Windows"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [q["id"] for q in data] == [original.json()["id"]]
+    assert 0 < data[0]["similarity"] <= 1
+
+
+@pytest.mark.asyncio
+async def test_create_duplicate_question_rejected(client: AsyncClient, pg_trgm, monkeypatch):
+    """Тест отклонения дубликата при создании вопроса"""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "duplicate_reject_threshold", 0.8)
+    response = await client.post("/questions/", json={"text": "Как установить Python на Windows?"})
+    assert response.status_code == 201
+
+    response = await client.post("/questions/", json={"text": "Как установить Python на Windows"})
+    assert response.status_code == 409
+
+    response = await client.post("/questions/", json={"text": "Как приготовить кофе?"})
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_similar_questions_without_pg_trgm(client: AsyncClient, monkeypatch):
+    """Тест работы без расширения pg_trgm"""
+    from app.core.config import settings
+    from app.core.database import database_features
+
+    monkeypatch.setattr(database_features, "pg_trgm", False)
+    response = await client.get("/questions/similar", params={"text": "Как установить Python"})
+    assert response.status_code == 501
+    assert "pg_trgm" in response.json()["detail"]
+
+    # Проверка на дубликаты пропускается
+    monkeypatch.setattr(settings, "duplicate_reject_threshold", 0.8)
+    for _ in range(2):
+        response = await client.post("/questions/", json={"text": "Как установить Python?"})
+        assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_create_single_statement(client: AsyncClient, statements):
+    """Тест создания вопроса и ответа одним запросом к базе"""
+    response = await client.post("/questions/", json={"text": "Вопрос"})
+    assert response.status_code == 201
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO questions")
+    question_id = response.json()["id"]
+
+    statements.clear()
+    response = await client.post(
+        f"/questions/{question_id}/answers/",
+        json={"user_id": "user1", "text": "Ответ"}
+    )
+    assert response.status_code == 201
+    assert response.json()["question_id"] == question_id
+    assert len(statements) == 1
+
+    statements.clear()
+    response = await client.post(
+        "/questions/999/answers/",
+        json={"user_id": "user1", "text": "Ответ"}
+    )
+    assert response.status_code == 404
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_single_statement(client: AsyncClient, statements):
+    """Тест удаления вопроса и ответа одним запросом к базе"""
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+    items = [{"user_id": "user1", "text": f"Ответ {i}"} for i in range(50)]
+    answers = await client.post(f"/questions/{question_id}/answers/bulk", json=items)
+    answer_id = answers.json()["created"][0]["id"]
+
+    statements.clear()
+    response = await client.delete(f"/answers/{answer_id}")
+    assert response.status_code == 204
+    assert len(statements) == 1
+
+    statements.clear()
+    response = await client.delete(f"/questions/{question_id}")
+    assert response.status_code == 204
+    assert len(statements) == 1
+
+    statements.clear()
+    assert (await client.delete(f"/questions/{question_id}")).status_code == 404
+    assert (await client.delete(f"/answers/{answer_id + 1}")).status_code == 404
+    assert len(statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_query_stats_headers(client: AsyncClient, query_budget):
+    """Тест заголовков статистики SQL запросов и бюджета запросов"""
+    response = await client.post("/questions/", json={"text": "Вопрос"})
+    assert response.headers["x-db-queries"] == "1"
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert '1 queries, 1 rows' in response.headers["server-timing"]
+
+    with query_budget(1):
+        response = await client.get("/questions/")
+    assert response.status_code == 200
+
+    with pytest.raises(pytest.fail.Exception, match="2 SQL запросов при бюджете 1"):
+        with query_budget(1):
+            await client.get("/questions/", params={"include_total": True})
+
+
+@pytest.mark.asyncio
+async def test_answer_rate_limit(client: AsyncClient, monkeypatch):
+    """Тест ограничения частоты ответов одного пользователя"""
+    from app.core.admission import answer_rate_limiter
+
+    monkeypatch.setattr(answer_rate_limiter, "burst", 2)
+    monkeypatch.setattr(answer_rate_limiter, "rate", 0.01)
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    url = f"/questions/{question_response.json()['id']}/answers/"
+
+    for _ in range(2):
+        response = await client.post(url, json={"user_id": "noisy", "text": "Ответ"})
+        assert response.status_code == 201
+
+    response = await client.post(url, json={"user_id": "noisy", "text": "Ответ"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+    response = await client.post(url, json={"user_id": "quiet", "text": "Ответ"})
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_question_reads_coalesced(client: AsyncClient, statements):
+    """Тест объединения одновременных запросов одного вопроса"""
+    import asyncio
+
+    from app.core.cache import question_flight
+
+    question_response = await client.post("/questions/", json={"text": "Популярный вопрос"})
+    question_id = question_response.json()["id"]
+    await client.post(
+        f"/questions/{question_id}/answers/",
+        json={"user_id": "user1", "text": "Ответ"}
+    )
+
+    followers = question_flight.followers
+    statements.clear()
+    responses = await asyncio.gather(
+        *(client.get(f"/questions/{question_id}") for _ in range(20))
+    )
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.content for r in responses}) == 1
+    assert question_flight.followers > followers
+    # Вопрос и ответы загружены один раз
+    assert len(statements) == 2
+
+    # После изменения данные загружаются заново
+    await client.post(
+        f"/questions/{question_id}/answers/",
+        json={"user_id": "user2", "text": "Новый ответ"}
+    )
+    response = await client.get(f"/questions/{question_id}")
+    assert response.json()["answer_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_question_cache_filled_from_primary(client: AsyncClient):
+    """Тест загрузки вопроса в общий кэш только с primary"""
+    from app.core.database import get_read_session_maker
+    from app.main import app
+
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+    await client.post(
+        f"/questions/{question_id}/answers/",
+        json={"user_id": "user1", "text": "Ответ"}
+    )
+
+    def stale_replica():
+        raise AssertionError("Вопрос загружен с реплики")
+
+    app.dependency_overrides[get_read_session_maker] = lambda: stale_replica
+    response = await client.get(f"/questions/{question_id}")
+    assert response.status_code == 200
+    assert response.json()["answer_count"] == 1
+    response = await client.get(f"/questions/{question_id}?max_answers=1")
+    assert response.status_code == 200
+    assert len(response.json()["answers"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_answer_batching(client: AsyncClient, statements, monkeypatch):
+    """Тест пакетной записи ответов"""
+    import asyncio
+
+    from app.core.database import get_session_maker
+    from app.crud import answers
+    from app.main import app
+
+    session_maker = app.dependency_overrides[get_session_maker]()
+    batcher = answers.AnswerBatcher(session_maker, max_size=10, max_delay=0.2, queue_size=100)
+    monkeypatch.setattr(answers, "answer_batcher", batcher)
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+
+    batcher.start()
+    try:
+        statements.clear()
+        responses = await asyncio.gather(*(
+            client.post(
+                f"/questions/{question_id}/answers/",
+                json={"user_id": f"user{i}", "text": f"Ответ {i}"}
+            )
+            for i in range(10)
+        ))
+        assert [r.status_code for r in responses] == [201] * 10
+        assert [r.json()["text"] for r in responses] == [f"Ответ {i}" for i in range(10)]
+        assert len(statements) == 1
+        assert batcher.batches == 1
+
+        # Ответы на несуществующий вопрос не мешают остальным в пачке
+        responses = await asyncio.gather(
+            client.post(f"/questions/{question_id}/answers/", json={"user_id": "u", "text": "Ответ"}),
+            client.post("/questions/999/answers/", json={"user_id": "u", "text": "Ответ"})
+        )
+        assert [r.status_code for r in responses] == [201, 404]
+    finally:
+        await batcher.stop()
+
+    response = await client.get(f"/questions/{question_id}")
+    assert response.json()["answer_count"] == 11
+
+
+@pytest.mark.asyncio
+async def test_answer_batching_returning_order(client: AsyncClient, monkeypatch):
+    """Тест сопоставления ответов пачки независимо от порядка RETURNING"""
+    import asyncio
+    from contextlib import asynccontextmanager
+
+    from app.core.database import get_session_maker
+    from app.crud import answers
+    from app.main import app
+
+    session_maker = app.dependency_overrides[get_session_maker]()
+
+    class ReversedResult:
+        def __init__(self, result):
+            self.result = result
+
+        def all(self):
+            return list(reversed(self.result.all()))
+
+    class ReversedSession:
+        def __init__(self, session):
+            self.session = session
+
+        async def execute(self, statement):
+            return ReversedResult(await self.session.execute(statement))
+
+        def __getattr__(self, name):
+            return getattr(self.session, name)
+
+    @asynccontextmanager
+    async def reversed_session_maker():
+        async with session_maker() as session:
+            yield ReversedSession(session)
+
+    batcher = answers.AnswerBatcher(reversed_session_maker, max_size=5, max_delay=0.2, queue_size=100)
+    monkeypatch.setattr(answers, "answer_batcher", batcher)
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+
+    batcher.start()
+    try:
+        responses = await asyncio.gather(*(
+            client.post(
+                f"/questions/{question_id}/answers/",
+                json={"user_id": f"user{i}", "text": f"Ответ {i}"}
+            )
+            for i in range(5)
+        ))
+    finally:
+        await batcher.stop()
+    assert batcher.batches == 1
+    assert [r.json()["user_id"] for r in responses] == [f"user{i}" for i in range(5)]
+    assert [r.json()["text"] for r in responses] == [f"Ответ {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.query_budget(3)
+async def test_get_question_answers_pagination(client: AsyncClient):
+    """Тест курсорной пагинации ответов на вопрос"""
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+    await client.post(
+        f"/questions/{question_id}/answers/bulk",
+        json=[{"user_id": "user1", "text": f"Ответ {i}"} for i in range(5)]
+    )
+
+    response = await client.get(
+        f"/questions/{question_id}/answers",
+        params={"page_size": 2, "include_total": True}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [a["text"] for a in data["items"]] == ["Ответ 0", "Ответ 1"]
+    assert data["total"] == 5
+
+    seen = [a["id"] for a in data["items"]]
+    while data["next_cursor"]:
+        response = await client.get(
+            f"/questions/{question_id}/answers",
+            params={"page_size": 2, "cursor": data["next_cursor"]}
+        )
+        data = response.json()
+        seen.extend(a["id"] for a in data["items"])
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+    response = await client.get("/questions/999/answers")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_question_preview(client: AsyncClient):
+    """Тест превью ответов в вопросе"""
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+    await client.post(
+        f"/questions/{question_id}/answers/bulk",
+        json=[{"user_id": "user1", "text": f"Ответ {i}"} for i in range(5)]
+    )
+
+    response = await client.get(f"/questions/{question_id}", params={"max_answers": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["answer_count"] == 5
+    assert [a["text"] for a in data["answers"]] == ["Ответ 0", "Ответ 1"]
+    etag = response.headers["etag"]
+
+    # Курсор превью продолжает список в /answers
+    response = await client.get(
+        f"/questions/{question_id}/answers",
+        params={"cursor": data["answers_next_cursor"]}
+    )
+    assert [a["text"] for a in response.json()["items"]] == ["Ответ 2", "Ответ 3", "Ответ 4"]
+
+    response = await client.get(f"/questions/{question_id}", params={"max_answers": 10})
+    assert len(response.json()["answers"]) == 5
+    assert response.json()["answers_next_cursor"] is None
+    response = await client.get(f"/questions/{question_id}")
+    assert response.headers["etag"] != etag
+
+    response = await client.get(
+        f"/questions/{question_id}",
+        params={"max_answers": 2},
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    # Новый ответ инвалидирует кэш превью и меняет его ETag
+    await client.post(
+        f"/questions/{question_id}/answers/",
+        json={"user_id": "user2", "text": "Ответ 5"}
+    )
+    response = await client.get(
+        f"/questions/{question_id}",
+        params={"max_answers": 2},
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["answer_count"] == 6
+
+    response = await client.get(f"/questions/{question_id}", params={"max_answers": 0})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_hot_questions(client: AsyncClient, query_budget):
+    """Тест ленты вопросов по активности ответов"""
+    ids = []
+    for i in range(3):
+        response = await client.post("/questions/", json={"text": f"Вопрос {i}"})
+        ids.append(response.json()["id"])
+    await client.post(
+        f"/questions/{ids[1]}/answers/bulk",
+        json=[{"user_id": "user1", "text": f"Ответ {i}"} for i in range(3)]
+    )
+    answer_response = await client.post(
+        f"/questions/{ids[2]}/answers/",
+        json={"user_id": "user1", "text": "Ответ"}
+    )
+
+    with query_budget(1):
+        response = await client.get("/questions/hot")
+    assert response.status_code == 200
+    data = response.json()
+    # Вопрос без ответов в ленту не попадает
+    assert [q["id"] for q in data] == [ids[1], ids[2]]
+    assert data[0]["answer_count"] == 3
+    assert data[0]["activity"] == pytest.approx(3, rel=0.01)
+    assert data[0]["last_answer_at"] is not None
+
+    # Удаление пересчитывает активность вопроса
+    await client.delete(f"/answers/{answer_response.json()['id']}")
+    response = await client.get("/questions/hot")
+    assert [q["id"] for q in response.json()] == [ids[1]]
+
+    response = await client.get("/questions/", params={"page_size": 3})
+    assert [q["answer_count"] for q in response.json()["items"]] == [0, 3, 0]
+
+
+@pytest.mark.asyncio
+async def test_get_user_answers(client: AsyncClient, query_budget):
+    """Тест истории ответов пользователя"""
+    ids = []
+    for i in range(2):
+        response = await client.post("/questions/", json={"text": f"Вопрос {i}"})
+        ids.append(response.json()["id"])
+    for i in range(4):
+        await client.post(
+            f"/questions/{ids[i % 2]}/answers/",
+            json={"user_id": "user1", "text": f"Ответ {i}"}
+        )
+    await client.post(f"/questions/{ids[0]}/answers/", json={"user_id": "user2", "text": "Чужой"})
+
+    with query_budget(2):
+        response = await client.get(
+            "/users/user1/answers",
+            params={"page_size": 3, "include_total": True}
+        )
+    assert response.status_code == 200
+    data = response.json()
+    assert [a["text"] for a in data["items"]] == ["Ответ 3", "Ответ 2", "Ответ 1"]
+    assert data["total"] == 4
+    assert data["questions_answered"] == 2
+
+    response = await client.get(
+        "/users/user1/answers",
+        params={"page_size": 3, "cursor": data["next_cursor"]}
+    )
+    data = response.json()
+    assert [a["text"] for a in data["items"]] == ["Ответ 0"]
+    assert data["next_cursor"] is None
+    assert data["total"] is None
+
+    response = await client.get("/users/nobody/answers", params={"include_total": True})
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+    assert response.json()["total"] == 0
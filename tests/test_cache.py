@@ -0,0 +1,204 @@
+"""Тесты для кэша ответов."""
+
+import asyncio
+
+import pytest
+
+from app.core.cache import (
+    FileBackend,
+    LRUCache,
+    MemoryBackend,
+    ResponseCache,
+    StaleWhileRevalidate,
+)
+from app.core.singleflight import SingleFlight
+from app.schemas.schemas import QuestionCreate
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Тест вытеснения давно не использованных записей"""
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_lru_cache_expires_entries():
+    """Тест истечения времени жизни записей"""
+    cache = LRUCache(max_entries=2, ttl=-1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_response_cache_read_through():
+    """Тест чтения через кэш и инвалидации"""
+    shared = MemoryBackend()
+    cache = ResponseCache(QuestionCreate, LRUCache(10, 60), shared=shared)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return QuestionCreate(text="Вопрос")
+
+    assert (await cache.get_or_load("q", load)).text == "Вопрос"
+    assert (await cache.get_or_load("q", load)).text == "Вопрос"
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    # Второй процесс с пустым локальным уровнем читает из общего
+    other = ResponseCache(QuestionCreate, LRUCache(10, 60), shared=shared)
+    assert (await other.get_or_load("q", load)).text == "Вопрос"
+    assert other.stats()["shared_hits"] == 1
+    assert len(calls) == 1
+
+    await cache.invalidate("q")
+    assert await shared.get("q") is None
+    await cache.get_or_load("q", load)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_response_cache_skips_store_after_concurrent_invalidation():
+    """Тест: значение, прочитанное до инвалидации, не кэшируется"""
+    cache = ResponseCache(QuestionCreate, LRUCache(10, 60))
+
+    async def load():
+        await cache.invalidate("q")
+        return QuestionCreate(text="Устаревший")
+
+    await cache.get_or_load("q", load)
+    assert cache.local.get("q") is None
+
+
+@pytest.mark.asyncio
+async def test_response_cache_invalidation_reaches_other_processes():
+    """Тест: инвалидация в одном процессе сбрасывает локальный уровень другого"""
+    shared = MemoryBackend()
+    first = ResponseCache(QuestionCreate, LRUCache(10, 60), shared=shared)
+    second = ResponseCache(QuestionCreate, LRUCache(10, 60), shared=shared)
+    texts = iter(["Старый", "Новый"])
+
+    async def load():
+        return QuestionCreate(text=next(texts))
+
+    assert (await first.get_or_load("q", load)).text == "Старый"
+    assert (await second.get_or_load("q", load)).text == "Старый"
+    assert second.stats()["shared_hits"] == 1
+
+    await second.invalidate("q")
+    assert (await first.get_or_load("q", load)).text == "Новый"
+    # Новое значение с актуальной версией видно второму процессу
+    assert (await second.get_or_load("q", load)).text == "Новый"
+
+
+@pytest.mark.asyncio
+async def test_response_cache_invalidation_is_per_key():
+    """Тест: инвалидация другого ключа не отменяет сохранение загрузки"""
+    shared = MemoryBackend()
+    cache = ResponseCache(QuestionCreate, LRUCache(10, 60), shared=shared)
+    other = ResponseCache(QuestionCreate, LRUCache(10, 60), shared=shared)
+
+    async def load():
+        await cache.invalidate("other")
+        return QuestionCreate(text="Вопрос")
+
+    await cache.get_or_load("q", load)
+    assert cache.local.get("q") is not None
+
+    async def stale_load():
+        # Ключ изменен в другом процессе во время загрузки
+        await other.invalidate("r")
+        return QuestionCreate(text="Устаревший")
+
+    await cache.get_or_load("r", stale_load)
+    assert cache.local.get("r") is None
+    assert await shared.get("r") is None
+
+
+@pytest.mark.asyncio
+async def test_file_backend(tmp_path):
+    """Тест файлового общего уровня кэша"""
+    backend = FileBackend(str(tmp_path))
+    await backend.set("key", b"value", ttl=60)
+    assert await backend.get("key") == b"value"
+
+    await backend.set("expired", b"value", ttl=-1)
+    assert await backend.get("expired") is None
+
+    await backend.delete("key")
+    assert await backend.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate():
+    """Тест отдачи устаревшего снимка с обновлением в фоне"""
+    snapshot = StaleWhileRevalidate(ttl=60)
+    values = iter([1, 2])
+
+    async def load():
+        return next(values)
+
+    assert await snapshot.get(load) == 1
+    assert await snapshot.get(load) == 1
+
+    # Устаревший снимок отдается сразу, обновление идет в фоне
+    snapshot._loaded_at -= 120
+    assert await snapshot.get(load) == 1
+    await snapshot._refresh
+    assert await snapshot.get(load) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight():
+    """Тест: одновременные вызовы разделяют одну загрузку"""
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return calls
+
+    waiters = [asyncio.create_task(flight.do("key", loader)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == [1] * 5
+    assert flight.stats()["coalescing_ratio"] == 0.8
+
+    # Завершившаяся загрузка не переиспользуется
+    assert await flight.do("key", loader) == 2
+    assert flight.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_errors_and_forget():
+    """Тест: ошибка загрузки получают все ожидающие, forget начинает новую"""
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("boom")
+
+    first = asyncio.create_task(flight.do("key", failing))
+    second = asyncio.create_task(flight.do("key", failing))
+    await asyncio.sleep(0)
+    flight.forget("key")
+    third = asyncio.create_task(flight.do("key", failing))
+    await asyncio.sleep(0)
+    release.set()
+
+    for task in (first, second, third):
+        with pytest.raises(RuntimeError):
+            await task
+    assert flight.leaders == 2
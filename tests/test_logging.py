@@ -0,0 +1,35 @@
+"""Тесты для журнала HTTP запросов."""
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from loguru import logger
+
+from app.core.logging import AccessLogMiddleware
+
+
+@pytest.mark.asyncio
+async def test_access_log_sampling():
+    """Тест: успешные запросы сэмплируются, ошибки логируются всегда"""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(AccessLogMiddleware, sample_rate=0.0)
+
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record), level="INFO")
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/items/1")
+            await client.get("/items/abc")
+    finally:
+        logger.remove(handler_id)
+
+    assert len(records) == 1
+    assert records[0]["extra"]["status"] == 422
+    assert records[0]["extra"]["path"] == "/items/abc"
+    assert records[0]["extra"]["method"] == "GET"
@@ -0,0 +1,71 @@
+"""Тесты для метрик Prometheus."""
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_exposition():
+    """Тест текстовой экспозиции гистограммы"""
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram("latency_seconds", "Задержка", ("route",), buckets=(0.1, 1.0))
+    )
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_counter_label_escaping():
+    """Тест экранирования значений меток"""
+    counter = Counter("events_total", "События", ("name",))
+    counter.inc('a"b')
+    assert counter.samples() == ['events_total{name="a\\"b"} 1']
+
+
+@pytest.mark.asyncio
+async def test_prometheus_endpoint_uses_route_templates(client: AsyncClient):
+    """Тест: метрики маркируются шаблоном маршрута, а не сырым путем"""
+    question_response = await client.post("/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["id"]
+    await client.get(f"/questions/{question_id}")
+    await client.get("/questions/999999")
+
+    response = await client.get("/metrics/prometheus")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'http_requests_total{method="GET",route="/questions/{question_id}",status="200"}'
+        in body
+    )
+    assert (
+        'http_requests_total{method="GET",route="/questions/{question_id}",status="404"}'
+        in body
+    )
+    assert f"/questions/{question_id}\"" not in body
+    assert 'http_request_db_seconds_count{method="POST",route="/questions/"}' in body
+    assert 'http_response_size_bytes_bucket{method="GET",route="/questions/{question_id}"' in body
+
+
+@pytest.mark.asyncio
+async def test_pool_statistics(client: AsyncClient):
+    """Тест публикации статистики пула соединений"""
+    await client.post("/questions/", json={"text": "Вопрос"})
+
+    body = (await client.get("/metrics/prometheus")).text
+    assert 'db_pool_size{pool="test"} 5' in body
+    assert 'db_pool_checked_out{pool="test"}' in body
+    assert 'db_pool_connects_total{pool="test"}' in body
+    assert 'db_pool_wait_seconds_count{pool="test"}' in body
+
+    data = (await client.get("/metrics")).json()
+    assert set(data["db_pool"]) == {"size", "checked_out", "checked_in", "overflow"}
@@ -0,0 +1,65 @@
+"""Тесты для быстрой сериализации ответов."""
+
+import json
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.serialization import FastJSONResponse, dump_json
+from app.schemas.schemas import AnswerResponse, QuestionWithAnswers
+
+
+def make_question() -> QuestionWithAnswers:
+    """Вопрос с двумя ответами"""
+    now = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    return QuestionWithAnswers(
+        id=1,
+        text="Вопрос",
+        answer_count=2,
+        created_at=now,
+        updated_at=now,
+        answers=[
+            {"id": i, "question_id": 1, "user_id": "user", "text": f"Ответ {i}",
+             "created_at": now, "updated_at": now}
+            for i in range(2)
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_fast_response_matches_default():
+    """Тест: быстрый путь отдает тот же JSON, что и response_model"""
+    question = make_question()
+    app = FastAPI()
+
+    @app.get("/default", response_model=QuestionWithAnswers)
+    async def default_path():
+        return question
+
+    @app.get("/fast", response_model=QuestionWithAnswers)
+    async def fast_path():
+        return FastJSONResponse(question, headers={"ETag": "tag"})
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        default = await client.get("/default")
+        fast = await client.get("/fast")
+
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.headers["etag"] == "tag"
+    assert fast.json() == default.json()
+
+
+def test_dump_json_schema_and_plain_values():
+    """Тест сериализации списков схем и простых данных"""
+    answers = make_question().answers
+    data = json.loads(dump_json(answers, List[AnswerResponse]))
+    assert [a["id"] for a in data] == [0, 1]
+    assert data[0]["created_at"] == "2025-01-01T12:00:00Z"
+
+    data = json.loads(dump_json({"items": answers, "total": 2}))
+    assert data["items"][1]["text"] == "Ответ 1"
+    assert data["items"][0]["created_at"] == "2025-01-01T12:00:00Z"